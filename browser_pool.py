@@ -0,0 +1,115 @@
+import os
+import asyncio
+import subprocess
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from playwright.async_api import async_playwright, Browser, BrowserContext, Playwright
+
+# Chromium is started detached with a debugging port and left running, so later
+# runs connect to it over CDP instead of paying the startup cost again
+CDP_PORT = int(os.getenv('BROWSER_POOL_PORT', '9223'))
+CDP_URL = f'http://127.0.0.1:{CDP_PORT}'
+PROFILE_DIR = Path('browser_pool_profile')
+
+# Browser settings, read once at import like the port above
+HEADLESS = os.getenv('BROWSER_HEADLESS', 'true').lower() == 'true'
+SLOWMO = int(os.getenv('BROWSER_SLOWMO', '0'))
+
+# One Playwright driver and one browser connection for the whole program
+_playwright: Optional[Playwright] = None
+_browser: Optional[Browser] = None
+_lock = asyncio.Lock()
+
+# Contexts handed back by finished runs, by user agent, ready to be reused
+_idle_contexts: Dict[str, List[BrowserContext]] = {}
+
+async def get_playwright() -> Playwright:
+    """Return the shared Playwright driver, starting it on first use."""
+    global _playwright
+    if _playwright is None:
+        _playwright = await async_playwright().start()
+    return _playwright
+
+async def _connect(playwright: Playwright) -> Optional[Browser]:
+    """Connect to the pooled Chromium, or return None if it isn't running."""
+    try:
+        return await playwright.chromium.connect_over_cdp(
+            CDP_URL,
+            slow_mo=SLOWMO
+        )
+    except Exception:
+        return None
+
+async def _launch(playwright: Playwright) -> Browser:
+    """Start Chromium in the background with a debugging port and connect to it."""
+    args = [
+        playwright.chromium.executable_path,
+        f'--remote-debugging-port={CDP_PORT}',
+        f'--user-data-dir={PROFILE_DIR.absolute()}',
+        '--no-first-run',
+        '--no-default-browser-check',
+        # Trim background work and memory so more contexts fit in one browser
+        '--disable-blink-features=AutomationControlled',
+        '--disable-background-networking',
+        '--disable-background-timer-throttling',
+        '--disable-renderer-backgrounding',
+        '--disable-features=Translate,BackForwardCache,MediaRouter,OptimizationHints',
+        '--js-flags=--max-old-space-size=256',
+    ]
+    if HEADLESS:
+        args.append('--headless=new')
+    if Path('/.dockerenv').exists():
+        # Chromium's sandbox needs privileges containers usually don't grant
+        args.append('--no-sandbox')
+
+    # Its own session, so the browser outlives this process
+    subprocess.Popen(args, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=True)
+
+    for _ in range(50):
+        await asyncio.sleep(0.2)
+        browser = await _connect(playwright)
+        if browser:
+            return browser
+    raise RuntimeError(f"Chromium did not open its debugging port {CDP_PORT}")
+
+async def get_browser() -> Browser:
+    """Return the shared Chromium browser, reusing a running one or launching it."""
+    global _browser
+    # Concurrent callers must not race to launch separate browsers
+    async with _lock:
+        if _browser is None or not _browser.is_connected():
+            playwright = await get_playwright()
+            _browser = await _connect(playwright) or await _launch(playwright)
+    return _browser
+
+async def acquire_context(user_agent: str, **options) -> BrowserContext:
+    """Return an idle context for this user agent, or open a new one with the given options."""
+    idle = _idle_contexts.get(user_agent)
+    if idle:
+        return idle.pop()
+    browser = await get_browser()
+    return await browser.new_context(user_agent=user_agent, **options)
+
+async def release_context(context: BrowserContext, user_agent: str) -> None:
+    """Close the context's pages and keep it for the next acquire_context call."""
+    for page in context.pages:
+        await page.close()
+    _idle_contexts.setdefault(user_agent, []).append(context)
+
+async def close(shutdown_browser: bool = False) -> None:
+    """Disconnect from the shared browser and stop Playwright.
+    Chromium keeps running for the next run unless shutdown_browser is set."""
+    global _playwright, _browser
+    _idle_contexts.clear()
+    if _browser:
+        if shutdown_browser:
+            session = await _browser.new_browser_cdp_session()
+            await session.send('Browser.close')
+        else:
+            # For a CDP connection this only disconnects
+            await _browser.close()
+        _browser = None
+    if _playwright:
+        await _playwright.stop()
+        _playwright = None
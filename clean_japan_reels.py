@@ -1,38 +1,51 @@
-import json
+import os
+import time
 from pathlib import Path
 import argparse
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 
-def should_keep_file(file_path: Path, keywords: list) -> tuple[bool, str, dict]:
+import orjson
+from tqdm import tqdm
+
+from keywords import build_keyword_automaton
+
+def should_keep_file(file_path: str) -> tuple[bool, str, dict]:
     """
     Check if file contains Japan-related content.
-    Returns (should_keep, reason, content)
+    Returns (should_keep, reason, content); content is None when the file couldn't be read.
     """
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        with open(file_path, 'rb') as f:
+            data = orjson.loads(f.read())
             
-        # Convert keywords and text to lowercase for case-insensitive matching
-        keywords = [k.lower() for k in keywords]
-        caption = data.get('caption', '').lower()
-        transcription = data.get('transcription', '').lower()
-        
+        caption = data.get('caption', '')
+        transcription = data.get('transcription', '')
         content = {
-            'caption': data.get('caption', ''),
-            'transcription': data.get('transcription', '')
+            'caption': caption,
+            'transcription': transcription
         }
         
-        # Check caption
-        if any(keyword in caption for keyword in keywords):
+        # Check caption first; the (usually much longer) transcription is only
+        # lowercased and scanned when the caption has no match
+        if next(_KW_AUTOMATON.iter(caption.lower()), None) is not None:
             return True, "Matched in caption", content
             
         # Check transcription
-        if any(keyword in transcription for keyword in keywords):
+        if next(_KW_AUTOMATON.iter(transcription.lower()), None) is not None:
             return True, "Matched in transcription", content
             
         return False, "No Japan-related content found", content
         
     except Exception as e:
-        return True, f"Error processing file (keeping it): {str(e)}", {'caption': '', 'transcription': ''}
+        return True, f"Error processing file (keeping it): {str(e)}", None
+
+def delete_file(file_path: str) -> str:
+    """Delete a file and return an error message, or an empty string on success."""
+    try:
+        os.unlink(file_path)
+        return ""
+    except Exception as e:
+        return str(e)
 
 def get_default_keywords():
     """Get the default list of Japan-related keywords."""
@@ -44,17 +57,49 @@ def get_default_keywords():
         'shibuya', 'harajuku', 'akihabara', 'shinjuku'
     ]
 
+# Built once at import, so each worker process compiles it exactly once
+_KW_AUTOMATON = build_keyword_automaton(get_default_keywords())
+
+# Remembers when the last run started so unchanged files are not re-parsed
+STATE_FILE = '.clean_japan_reels.state'
+
+# Every reel the extractor writes is larger than this (the timestamp alone is
+# 26 bytes), so anything smaller is a truncated or empty file
+MIN_FILE_SIZE = 64
+
+def load_checkpoint(output_dir: Path) -> tuple[float, set]:
+    """
+    Return the start time of the last run, or 0 if there is none, and the names of
+    the files that run left to be checked again.
+    The checkpoint is ignored when the keyword list has changed since it was written.
+    """
+    try:
+        with open(output_dir / STATE_FILE, 'rb') as f:
+            state = orjson.loads(f.read())
+        if state.get('keywords') != get_default_keywords():
+            return 0.0, set()
+        return float(state.get('checkpoint', 0.0)), set(state.get('recheck', []))
+    except Exception:
+        return 0.0, set()
+
+def save_checkpoint(output_dir: Path, checkpoint: float, recheck: list) -> None:
+    """Record the start time of a run, and the files it couldn't read or delete."""
+    state = {'checkpoint': checkpoint, 'keywords': get_default_keywords(), 'recheck': recheck}
+    with open(output_dir / STATE_FILE, 'wb') as f:
+        f.write(orjson.dumps(state))
+
 def main():
     parser = argparse.ArgumentParser(description='Clean non-Japan related reels from output folder')
     parser.add_argument('--delete', action='store_true', 
                       help='Actually delete files. Without this, only shows what would be deleted')
     parser.add_argument('--output-dir', default='output',
                       help='Directory containing JSON files (default: output)')
+    parser.add_argument('--full', action='store_true',
+                      help='Re-check every file, ignoring the checkpoint from the last complete run')
+    parser.add_argument('--verbose', action='store_true',
+                      help='List every deleted file instead of showing a progress bar')
     args = parser.parse_args()
     
-    # Use the same keywords as the extractor
-    keywords = get_default_keywords()
-    
     output_dir = Path(args.output_dir)
     if not output_dir.exists():
         print(f"Error: Directory {output_dir} does not exist")
@@ -62,46 +107,98 @@ def main():
         
     files_to_delete = []
     files_to_keep = []
+    unchanged_count = 0
+    # Unreadable or too small files, e.g. written by an extractor run at the same time
+    unreadable = []
     
-    # Process all JSON files
-    for file_path in output_dir.glob('*.json'):
-        should_keep, reason, content = should_keep_file(file_path, keywords)
-        
+    scan_started = time.time()
+    checkpoint, recheck = (0.0, set()) if args.full else load_checkpoint(output_dir)
+    
+    # Use the cheap stat() from scandir to avoid parsing files that cannot have changed
+    paths = []
+    with os.scandir(output_dir) as it:
+        for entry in it:
+            if not entry.is_file() or not entry.name.endswith('.json'):
+                continue
+            st = entry.stat()
+            if st.st_mtime < checkpoint and entry.name not in recheck:
+                # Already kept by an earlier run
+                unchanged_count += 1
+            elif st.st_size < MIN_FILE_SIZE:
+                files_to_keep.append((entry.name, "Empty or truncated file (keeping it)"))
+                unreadable.append(entry.name)
+            else:
+                paths.append(entry.path)
+    
+    # Process remaining JSON files in parallel; parsing is GIL-bound so use processes
+    with ProcessPoolExecutor() as executor:
+        results = list(executor.map(should_keep_file, paths, chunksize=32))
+    
+    for file_path, (should_keep, reason, content) in zip(paths, results):
+        if content is None:
+            unreadable.append(os.path.basename(file_path))
         if should_keep:
-            files_to_keep.append((file_path.name, reason))
+            files_to_keep.append((os.path.basename(file_path), reason))
         else:
             files_to_delete.append((file_path, content))
     
-    # Print summary
-    print(f"\nFound {len(files_to_keep) + len(files_to_delete)} total files")
-    print(f"Files to keep: {len(files_to_keep)}")
-    print(f"Files to delete: {len(files_to_delete)}")
+    # Build the report and write it in one go instead of one print per line
+    checked_count = len(files_to_keep) + len(files_to_delete)
+    lines = [
+        f"\nFound {checked_count + unchanged_count} total files",
+        f"Unchanged since last run (not re-checked): {unchanged_count}",
+        f"Checked: {checked_count}",
+        f"Files to keep: {len(files_to_keep)}",
+        f"Files to delete: {len(files_to_delete)}",
+    ]
+    if unreadable:
+        lines.append(f"Files that could not be read (checked again next run): {len(unreadable)}")
     
     # Show files to be kept
-    print("\nKeeping files:")
+    lines.append("\nKeeping files:")
     for filename, reason in files_to_keep:
-        print(f"  {filename} ({reason})")
+        lines.append(f"  {filename} ({reason})")
     
     # Show files to be deleted with their content
-    print("\nFiles to be deleted:")
+    lines.append("\nFiles to be deleted:")
     for file_path, content in files_to_delete:
-        print(f"\n  {file_path.name}")
-        print("  Caption:")
-        print(f"    {content['caption']}")
-        print("  Transcription:")
-        print(f"    {content['transcription']}")
+        lines.append(f"\n  {os.path.basename(file_path)}")
+        lines.append("  Caption:")
+        lines.append(f"    {content['caption']}")
+        lines.append("  Transcription:")
+        lines.append(f"    {content['transcription']}")
+    print("\n".join(lines))
     
     # Delete files if --delete flag is used
     if args.delete and files_to_delete:
         print("\nDeleting files...")
-        for file_path, _ in files_to_delete:
-            try:
-                file_path.unlink()
-                print(f"  Deleted {file_path.name}")
-            except Exception as e:
-                print(f"  Error deleting {file_path.name}: {str(e)}")
-    elif files_to_delete:
-        print("\nNo files deleted (use --delete flag to actually delete files)")
+        # unlink releases the GIL, so threads overlap the syscalls
+        paths_to_delete = [file_path for file_path, _ in files_to_delete]
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            results = executor.map(delete_file, paths_to_delete)
+            if not args.verbose:
+                results = tqdm(results, total=len(paths_to_delete), desc="Deleting", unit="file", miniters=100)
+            errors = list(results)
+        
+        # Errors are always reported; successful deletions only with --verbose
+        lines = []
+        for file_path, error in zip(paths_to_delete, errors):
+            if error:
+                lines.append(f"  Error deleting {os.path.basename(file_path)}: {error}")
+            elif args.verbose:
+                lines.append(f"  Deleted {os.path.basename(file_path)}")
+        if lines:
+            print("\n".join(lines))
+        pending_deletion = [os.path.basename(file_path)
+                            for file_path, error in zip(paths_to_delete, errors) if error]
+    else:
+        pending_deletion = [os.path.basename(file_path) for file_path, _ in files_to_delete]
+        if pending_deletion:
+            print("\nNo files deleted (use --delete flag to actually delete files)")
+    
+    # Files still pending deletion or unread are named in the state file, so the next
+    # run checks them again while skipping everything else older than this one
+    save_checkpoint(output_dir, scan_started, unreadable + pending_deletion)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -1,16 +1,28 @@
 import os
 import json
-import time
+import asyncio
 from pathlib import Path
 from typing import Optional, Dict
 import httpx
-import brotli
-from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeout
+from playwright.async_api import async_playwright, BrowserContext, TimeoutError as PlaywrightTimeout
 from dotenv import load_dotenv
 import re
 
 load_dotenv()
 
+# Media ID patterns in priority order; the generic "id" pattern must only win
+# when the more specific ones are absent, so they are tried one after another
+_MEDIA_ID_PATTERNS = (
+    re.compile(r'"media_id":"(\d+)"'),
+    re.compile(r'instagram://media\?id=(\d+)'),
+    re.compile(r'"id":"(\d+)"'),
+)
+
+_SHARED_DATA_RE = re.compile(r'window\._sharedData\s*=\s*(\{.*?\});</script>', re.S)
+
+# Captions live in the HTML/JSON, so these downloads are never needed
+_BLOCKED_RESOURCE_TYPES = {'image', 'media', 'font'}
+
 class InstagramCaptionFetcher:
     USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36'
 
@@ -19,27 +31,106 @@ class InstagramCaptionFetcher:
         if not self.session_id:
             raise ValueError("INSTAGRAM_SESSION_ID not found in .env file")
 
-    def fetch_via_api(self, reel_id: str) -> Optional[str]:
+        # Shared HTTP client and browser, created lazily on first use
+        self._client = None
+        self._pw = None
+        self._browser = None
+        self._ctx = None
+        self._ctx_lock = asyncio.Lock()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def close(self) -> None:
+        """Close the shared HTTP client and browser"""
+        if self._client:
+            await self._client.aclose()
+            self._client = None
+        if self._browser:
+            await self._browser.close()
+            self._browser = None
+            self._ctx = None
+        if self._pw:
+            await self._pw.stop()
+            self._pw = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Return the shared HTTP client, creating it on first use"""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                headers={
+                    "User-Agent": self.USER_AGENT,
+                    "Accept": "*/*",
+                    "Accept-Language": "en-US,en;q=0.9",
+                    "Accept-Encoding": "gzip, deflate, br",
+                    "Referer": "https://www.instagram.com/",
+                    "X-IG-App-ID": "936619743392459",
+                    "X-Requested-With": "XMLHttpRequest",
+                    "X-ASBD-ID": "198387",
+                    "Cookie": f"sessionid={self.session_id}",
+                },
+                timeout=30.0,
+                follow_redirects=True,
+                http2=True
+            )
+        return self._client
+
+    async def _get_context(self) -> BrowserContext:
+        """Return the shared authenticated browser context, launching the browser on first use"""
+        # Concurrent fetches must not race to launch separate browsers
+        async with self._ctx_lock:
+            if self._ctx is None:
+                self._pw = await async_playwright().start()
+                self._browser = await self._pw.chromium.launch(headless=True, args=['--disable-gpu'])
+                ctx = await self._browser.new_context(
+                    user_agent=self.USER_AGENT,
+                    viewport={'width': 1280, 'height': 720}
+                )
+                await ctx.route('**/*', self._block_heavy_resources)
+
+                # Add authentication cookies
+                await ctx.add_cookies([{
+                    "name": "sessionid",
+                    "value": self.session_id,
+                    "domain": ".instagram.com",
+                    "path": "/"
+                }])
+                self._ctx = ctx
+        return self._ctx
+
+    async def _block_heavy_resources(self, route) -> None:
+        """Abort image, video and font requests; let everything else through"""
+        if route.request.resource_type in _BLOCKED_RESOURCE_TYPES:
+            await route.abort()
+        else:
+            await route.continue_()
+
+    async def fetch(self, reel_url: str) -> Optional[str]:
+        """Fetch a reel caption via the API, falling back to scraping the page"""
+        reel_id = reel_url.strip('/').split('/')[-1]
+        caption = await self.fetch_via_api(reel_id)
+        if caption:
+            print(f"[{reel_id}] Success via API!")
+            return caption
+
+        print(f"[{reel_id}] API method failed, trying web scraping...")
+        caption = await self.fetch_via_scraping(reel_url)
+        if caption:
+            print(f"[{reel_id}] Success via Scraping!")
+        else:
+            print(f"[{reel_id}] Scraping method failed")
+        return caption
+
+    async def fetch_via_api(self, reel_id: str) -> Optional[str]:
         """Attempt to fetch caption using Instagram's API"""
-        client = httpx.Client(
-            headers={
-                "User-Agent": self.USER_AGENT,
-                "Accept": "*/*",
-                "Accept-Language": "en-US,en;q=0.9",
-                "Accept-Encoding": "gzip, deflate, br",
-                "Referer": "https://www.instagram.com/",
-                "X-IG-App-ID": "936619743392459",
-                "X-Requested-With": "XMLHttpRequest",
-                "X-ASBD-ID": "198387",
-                "Cookie": f"sessionid={self.session_id}",
-            },
-            timeout=30.0,
-            follow_redirects=True
-        )
+        client = self._get_client()
 
         try:
             # First get the media ID
-            media_id = self.get_media_id(f"https://www.instagram.com/reels/{reel_id}/")
+            media_id = await self.get_media_id(f"https://www.instagram.com/reels/{reel_id}/")
             if not media_id:
                 print("Could not find media ID")
                 return None
@@ -53,18 +144,13 @@ class InstagramCaptionFetcher:
             for api_url in endpoints:
                 try:
                     print(f"Trying API endpoint: {api_url}")
-                    response = client.get(api_url)
+                    response = await client.get(api_url)
                     print(f"Response Status: {response.status_code}")
                     print(f"Response Headers: {dict(response.headers)}")
 
                     if response.status_code == 200:
-                        # Handle potential compression
-                        content_encoding = response.headers.get('content-encoding', '').lower()
-                        if content_encoding == 'br':
-                            decompressed = brotli.decompress(response.content)
-                            data = json.loads(decompressed)
-                        else:
-                            data = response.json()
+                        # httpx decodes gzip/brotli bodies transparently
+                        data = response.json()
 
                         print(f"Response Data: {json.dumps(data, indent=2)}")
                         
@@ -82,179 +168,149 @@ class InstagramCaptionFetcher:
             print(f"API Error: {str(e)}")
             return None
 
-    def fetch_via_scraping(self, reel_url: str) -> Optional[str]:
+    async def fetch_via_scraping(self, reel_url: str) -> Optional[str]:
         """Attempt to fetch caption by scraping the page"""
-        with sync_playwright() as p:
-            browser = p.chromium.launch(headless=False)
-            context = browser.new_context(
-                user_agent=self.USER_AGENT,
-                viewport={'width': 1280, 'height': 720}
-            )
+        page = await (await self._get_context()).new_page()
 
-            # Add authentication cookies
-            context.add_cookies([{
-                "name": "sessionid",
-                "value": self.session_id,
-                "domain": ".instagram.com",
-                "path": "/"
-            }])
+        try:
+            print(f"Navigating to: {reel_url}")
+            await page.goto(reel_url)
 
-            page = context.new_page()
+            # Wait for the page to be fully loaded
+            await page.wait_for_load_state("networkidle")
 
+            # Wait for specific elements that indicate the reel is loaded
             try:
-                print(f"Navigating to: {reel_url}")
-                page.goto(reel_url)
-                
-                # Wait for the page to be fully loaded
-                page.wait_for_load_state("networkidle")
-                
-                # Wait for specific elements that indicate the reel is loaded
+                await page.wait_for_selector('video', timeout=10000)
+                print("Video element found")
+            except PlaywrightTimeout:
+                print("Timeout waiting for video element")
+
+            # Try to extract data from shared data
+            print("Looking for shared data...")
+            shared_data = None
+            match = _SHARED_DATA_RE.search(await page.content())
+            if match:
                 try:
-                    page.wait_for_selector('video', timeout=10000)
-                    print("Video element found")
-                except PlaywrightTimeout:
-                    print("Timeout waiting for video element")
-
-                # Additional wait for dynamic content
-                time.sleep(3)
-
-                # Try to extract data from shared data
-                print("Looking for shared data...")
-                shared_data = None
-                for script in page.locator('script').all():
-                    try:
-                        text = script.inner_text()
-                        if 'window._sharedData = ' in text:
-                            shared_data = json.loads(text.split('window._sharedData = ')[1].split(';</script>')[0])
-                            print("Found window._sharedData")
-                            break
-                    except Exception:
-                        continue
-
-                if shared_data:
-                    try:
-                        # Navigate through shared data to find caption
-                        entry_data = shared_data.get('entry_data', {})
-                        if 'PostPage' in entry_data and entry_data['PostPage']:
-                            media = entry_data['PostPage'][0].get('graphql', {}).get('shortcode_media', {})
-                            if media:
-                                caption_edges = media.get('edge_media_to_caption', {}).get('edges', [])
-                                if caption_edges:
-                                    caption = caption_edges[0]['node']['text']
-                                    print(f"Found caption in shared data: {caption}")
-                                    return caption
-                    except Exception as e:
-                        print(f"Error parsing shared data: {str(e)}")
-
-                # Try different selectors with explicit waits
-                selectors = [
-                    'div[class*="_a9zs"]',
-                    'span[class*="_a9zs"]',
-                    'div[data-testid="post-comment-root"]',
-                    'article div > span',  # Generic span inside article
-                    'article div > div > span',  # Nested span
-                ]
-
-                for selector in selectors:
-                    print(f"Trying selector: {selector}")
-                    try:
-                        # Wait briefly for each selector
-                        elements = page.locator(selector).all()
-                        for element in elements:
-                            if element.is_visible():
-                                text = element.inner_text()
-                                if text and len(text) > 5:  # Avoid empty or too short texts
-                                    print(f"Found text with selector {selector}: {text}")
-                                    return text
-                    except Exception as e:
-                        print(f"Error with selector {selector}: {str(e)}")
-
-                # Save debug info if nothing found
-                page.screenshot(path="debug_screenshot.png")
-                with open("debug_page.html", "w", encoding="utf-8") as f:
-                    f.write(page.content())
+                    shared_data = json.loads(match.group(1))
+                    print("Found window._sharedData")
+                except json.JSONDecodeError:
+                    pass
 
-                return None
-            except Exception as e:
-                print(f"Scraping Error: {str(e)}")
-                return None
-            finally:
-                browser.close()
+            if shared_data:
+                try:
+                    # Navigate through shared data to find caption
+                    entry_data = shared_data.get('entry_data', {})
+                    if 'PostPage' in entry_data and entry_data['PostPage']:
+                        media = entry_data['PostPage'][0].get('graphql', {}).get('shortcode_media', {})
+                        if media:
+                            caption_edges = media.get('edge_media_to_caption', {}).get('edges', [])
+                            if caption_edges:
+                                caption = caption_edges[0]['node']['text']
+                                print(f"Found caption in shared data: {caption}")
+                                return caption
+                except Exception as e:
+                    print(f"Error parsing shared data: {str(e)}")
 
-    def get_media_id(self, reel_url: str) -> Optional[str]:
+            # Try different selectors with explicit waits
+            selectors = [
+                'div[class*="_a9zs"]',
+                'span[class*="_a9zs"]',
+                'div[data-testid="post-comment-root"]',
+                'article div > span',  # Generic span inside article
+                'article div > div > span',  # Nested span
+            ]
+
+            for selector in selectors:
+                print(f"Trying selector: {selector}")
+                try:
+                    # Wait briefly for each selector
+                    elements = await page.locator(selector).all()
+                    for element in elements:
+                        if await element.is_visible():
+                            text = await element.inner_text()
+                            if text and len(text) > 5:  # Avoid empty or too short texts
+                                print(f"Found text with selector {selector}: {text}")
+                                return text
+                except Exception as e:
+                    print(f"Error with selector {selector}: {str(e)}")
+
+            # Save debug info if nothing found, one file per reel since fetches run concurrently
+            reel_id = reel_url.strip('/').split('/')[-1]
+            await page.screenshot(path=f"debug_screenshot_{reel_id}.png")
+            with open(f"debug_page_{reel_id}.html", "w", encoding="utf-8") as f:
+                f.write(await page.content())
+
+            return None
+        except Exception as e:
+            print(f"Scraping Error: {str(e)}")
+            return None
+        finally:
+            await page.close()
+
+    def _find_media_id(self, page_content: str) -> Optional[str]:
+        """Look for the media ID in the page source"""
+        for pattern in _MEDIA_ID_PATTERNS:
+            match = pattern.search(page_content)
+            if match:
+                media_id = match.group(1)
+                print(f"Found media ID: {media_id}")
+                return media_id
+
+        return None
+
+    async def get_media_id(self, reel_url: str) -> Optional[str]:
         """Get the internal media ID from the page source"""
-        with sync_playwright() as p:
-            browser = p.chromium.launch(headless=True)
-            context = browser.new_context(
-                user_agent=self.USER_AGENT,
-                viewport={'width': 1280, 'height': 720}
-            )
+        # The ID is usually in the static HTML, so try a plain GET first
+        try:
+            response = await self._get_client().get(reel_url)
+            if response.status_code == 200:
+                media_id = self._find_media_id(response.text)
+                if media_id:
+                    return media_id
+            print("Media ID not in static HTML, rendering page...")
+        except Exception as e:
+            print(f"Error fetching page HTML: {str(e)}")
 
-            context.add_cookies([{
-                "name": "sessionid",
-                "value": self.session_id,
-                "domain": ".instagram.com",
-                "path": "/"
-            }])
+        # Fall back to the browser when the page needs JavaScript to render
+        page = await (await self._get_context()).new_page()
+        try:
+            await page.goto(reel_url, wait_until="domcontentloaded")
 
-            page = context.new_page()
+            # Return as soon as the media ID shows up instead of sleeping
             try:
-                page.goto(reel_url, wait_until="domcontentloaded")
-                time.sleep(3)
-
-                # Look for the media ID in the page source
-                page_content = page.content()
-                
-                patterns = [
-                    r'"media_id":"(\d+)"',
-                    r'instagram://media\?id=(\d+)',
-                    r'"id":"(\d+)"',
-                ]
-                
-                for pattern in patterns:
-                    match = re.search(pattern, page_content)
-                    if match:
-                        media_id = match.group(1)
-                        print(f"Found media ID: {media_id}")
-                        return media_id
-                
-                return None
-            except Exception as e:
-                print(f"Error getting media ID: {str(e)}")
-                return None
-            finally:
-                browser.close()
+                await page.wait_for_function(
+                    "/\"media_id\":/.test(document.documentElement.outerHTML)",
+                    timeout=5000
+                )
+            except PlaywrightTimeout:
+                print("Timeout waiting for media ID in page")
+
+            return self._find_media_id(await page.content())
+        except Exception as e:
+            print(f"Error getting media ID: {str(e)}")
+            return None
+        finally:
+            await page.close()
+
+async def fetch_captions(reel_urls: list) -> None:
+    """Fetch captions for all reels concurrently over one client and browser"""
+    async with InstagramCaptionFetcher() as fetcher:
+        captions = await asyncio.gather(*(fetcher.fetch(url) for url in reel_urls))
+
+    for reel_url, caption in zip(reel_urls, captions):
+        print(f"\n{reel_url}")
+        print("-" * 50)
+        print(f"Caption: {caption}" if caption else "No caption found")
 
 def main():
     import argparse
     parser = argparse.ArgumentParser(description='Test Instagram Caption Fetching')
-    parser.add_argument('reel_url', help='Instagram Reel URL')
+    parser.add_argument('reel_urls', nargs='+', help='One or more Instagram Reel URLs')
     args = parser.parse_args()
 
-    reel_id = args.reel_url.strip('/').split('/')[-1]
-    fetcher = InstagramCaptionFetcher()
-
-    print(f"\nTesting caption fetch for reel: {reel_id}")
-    print("-" * 50)
-
-    # Try API first
-    print("\n1. Trying API...")
-    caption = fetcher.fetch_via_api(reel_id)
-    if caption:
-        print("Success via API!")
-        print(f"Caption: {caption}")
-    else:
-        print("API method failed")
-
-    # If API fails, try scraping
-    if not caption:
-        print("\n2. Trying Web Scraping...")
-        caption = fetcher.fetch_via_scraping(args.reel_url)
-        if caption:
-            print("Success via Scraping!")
-            print(f"Caption: {caption}")
-        else:
-            print("Scraping method failed")
+    print(f"\nTesting caption fetch for {len(args.reel_urls)} reel(s)")
+    asyncio.run(fetch_captions(args.reel_urls))
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
\ No newline at end of file
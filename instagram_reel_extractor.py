@@ -1,26 +1,39 @@
 import os
 import json
+import io
+import itertools
+import asyncio
+import functools
+import hashlib
+import logging
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
 import random
 import re
 
 import openai
-from playwright.sync_api import sync_playwright, Page, Browser
+import orjson
+from playwright.async_api import async_playwright, Page, BrowserContext, TimeoutError as PlaywrightTimeout
 from dotenv import load_dotenv
 import httpx
-import brotli
 
-from media_utils import download_video, extract_audio, cleanup_temp_files
-from keywords import get_default_keywords
+from media_utils import download_video, extract_audio_bytes, fetch_and_extract, probe_audio, cleanup_temp_files
+from rate_limit import TokenBucket
+from whisper_batcher import get_batcher
+from keywords import get_default_keywords, build_keyword_automaton
+import browser_pool
 
 # Custom exception class - moved to top
 class KeywordNotFoundError(Exception):
     """Raised when a reel doesn't contain any of the specified keywords."""
     pass
 
+log = logging.getLogger(__name__)
+
 # Load environment variables from .env file
 load_dotenv(dotenv_path=".env")  # Explicitly specify the .env file
 
@@ -29,9 +42,153 @@ openai.api_key = os.getenv("OPENAI_API_KEY")
 if not openai.api_key:
     raise ValueError("OPENAI_API_KEY not found in .env file")
 
+# One client for every transcription so HTTPS connections are reused across reels;
+# the pool is sized to cover WHISPER_POOL's concurrent uploads, and HTTP/2 lets
+# them share a connection instead of each doing its own TLS handshake
+OPENAI_CLIENT = openai.OpenAI(
+    timeout=httpx.Timeout(60.0, connect=5.0),
+    max_retries=2,
+    http_client=httpx.Client(
+        http2=True,
+        limits=httpx.Limits(max_connections=16, max_keepalive_connections=16)
+    )
+)
+
+# Whisper uploads are network-bound, so a dedicated pool lets several reels'
+# transcriptions overlap without competing with downloads for default threads
+WHISPER_WORKERS = int(os.getenv('WHISPER_WORKERS', '8'))
+WHISPER_POOL = ThreadPoolExecutor(
+    max_workers=WHISPER_WORKERS,
+    thread_name_prefix='whisper'
+)
+
+# The scraper only needs the page DOM and API JSON; the video itself is fetched by
+# yt-dlp, so these downloads are pure overhead. Stylesheets stay because the
+# visibility checks depend on them
+BLOCKED_RESOURCE_TYPES = {'image', 'media', 'font'}
+BLOCKED_URL_PARTS = ('facebook.com/tr', 'google-analytics.com', 'googletagmanager.com', 'doubleclick.net')
+
+# ffmpeg/ffprobe run as their own processes, so threads are enough to run several
+# reels' jobs side by side; the pool caps how many run at once
+FFMPEG_WORKERS = int(os.getenv('FFMPEG_WORKERS', str(min(os.cpu_count() or 1, 4))))
+FFMPEG_POOL = ThreadPoolExecutor(
+    max_workers=FFMPEG_WORKERS,
+    thread_name_prefix='ffmpeg'
+)
+
+# Local faster-whisper model for WHISPER_BACKEND=local, loaded on first use
+_local_whisper_model = None
+_local_whisper_lock = threading.Lock()
+
+def transcribe_local(audio: Tuple[str, bytes, str]) -> str:
+    """Transcribe in-memory audio on this machine with faster-whisper: INT8 weights
+    with FP16 compute on a CUDA GPU when there is one, plain INT8 on the CPU otherwise.
+    The reel is split at pauses and its pieces decoded as one batch."""
+    global _local_whisper_model
+    with _local_whisper_lock:
+        if _local_whisper_model is None:
+            try:
+                import ctranslate2
+                from faster_whisper import BatchedInferencePipeline, WhisperModel
+            except ImportError:
+                raise ImportError("WHISPER_BACKEND=local requires faster-whisper: pip install faster-whisper")
+            if ctranslate2.get_cuda_device_count() > 0:
+                model_name = os.getenv('WHISPER_MODEL', 'large-v3')
+                model = WhisperModel(model_name, device='cuda', compute_type='int8_float16')
+            else:
+                model_name = os.getenv('WHISPER_MODEL', 'base')
+                model = WhisperModel(model_name, device='cpu', compute_type='int8')
+            _local_whisper_model = BatchedInferencePipeline(model=model)
+    
+    _, data, _ = audio
+    # Greedy decoding; Silero VAD trims silence and cuts the speech into the batch
+    segments, _ = _local_whisper_model.transcribe(
+        io.BytesIO(data),
+        beam_size=1,
+        language='en',
+        vad_filter=True,
+        batch_size=int(os.getenv('WHISPER_BATCH_SIZE', '8'))
+    )
+    return " ".join(segment.text.strip() for segment in segments)
+
+# Proactive throttle for Whisper calls, so bursts wait briefly instead of
+# tripping 429s and long retry backoffs (0 disables a limit)
+WHISPER_RATE_LIMIT = TokenBucket(
+    rpm=float(os.getenv('OPENAI_RPM', '50')),
+    tpm=float(os.getenv('OPENAI_TPM', '0'))
+)
+
+# Rough token cost of a second of audio, used against OPENAI_TPM
+TOKENS_PER_AUDIO_SECOND = 50
+
+# Saved Instagram session (cookies and local storage) reused across runs
+STORAGE_STATE_FILE = Path('state.json')
+# Older sessions go through the full login check again
+STORAGE_STATE_MAX_AGE = 7 * 24 * 3600
+
+# How long the reel URLs collected from a start reel's feed are replayed instead of scrolling again
+URL_PLAN_MAX_AGE = 7 * 24 * 3600
+
+# The ID segment of any instagram.com/<kind>/<id> URL
+REEL_URL_RE = re.compile(r'instagram\.com/[^/]+/([A-Za-z0-9_-]+)')
+
+# Caption embedded in the page's inline post JSON, as a JSON string body
+CAPTION_RE = re.compile(r'"edge_media_to_caption":\{"edges":\[\{"node":\{"text":"((?:[^"\\]|\\.)*)"')
+
+# Where the page source carries the media ID, most specific first
+MEDIA_ID_PATTERNS = (
+    re.compile(r'"media_id":"(\d+)"'),
+    re.compile(r'instagram://media\?id=(\d+)'),
+    re.compile(r'"id":"(\d+)"'),
+)
+
+# Shortcodes are the media ID written in this base64 alphabet
+SHORTCODE_ALPHABET = 'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_'
+
+@functools.lru_cache(maxsize=4096)
+def reel_shortcode(url: str) -> str:
+    """Return the reel ID (shortcode) from a reel URL, with or without a trailing slash
+    or query string, or from a bare shortcode."""
+    path = url.split('?', 1)[0].split('#', 1)[0]
+    return path.strip('/').split('/')[-1]
+
+def shortcode_to_media_id(shortcode: str) -> int:
+    """Decode a reel shortcode into its numeric media ID, no page load needed."""
+    media_id = 0
+    for char in shortcode:
+        media_id = media_id * 64 + SHORTCODE_ALPHABET.index(char)
+    return media_id
+
 class InstagramReelExtractor:
     # Single Chrome Windows user agent
     USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36'
+    
+    # Caption element patterns Instagram uses, tried in order when the API has no caption
+    CAPTION_SELECTORS = (
+        'span[class*="caption"]',
+        'span[class*="Caption"]',
+        'div[class*="caption"]',
+        'div[class*="Caption"]'
+    )
+    
+    # Returns the text of the first visible, non-empty element matching the selectors
+    CAPTION_JS = """(selectors) => {
+        for (const selector of selectors) {
+            for (const el of document.querySelectorAll(selector)) {
+                const text = el.offsetParent !== null ? el.innerText.trim() : '';
+                if (text) return text;
+            }
+        }
+        return '';
+    }"""
+    
+    # Elements that indicate Google is showing a CAPTCHA
+    CAPTCHA_SELECTORS = (
+        'iframe[src*="recaptcha"]',
+        'iframe[src*="captcha"]',
+        '#captcha',
+        '.g-recaptcha',
+    )
 
     def __init__(self, start_input: str, num_reels: int, output_dir: Path, is_search: bool = False):
         """Initialize the Instagram reel extractor."""
@@ -39,9 +196,31 @@ class InstagramReelExtractor:
         self.is_search = is_search
         self.num_reels = num_reels
         self.output_dir = output_dir
+        # Captions and transcriptions by reel ID, kept as soon as they arrive so a
+        # re-run after a failed reel doesn't pay for them again
+        self.cache_dir = output_dir / '.cache'
         self.browser = None
+        self.context = None
         self.page = None
         
+        # Skip the randomized "human" pauses; a saved logged-in session rarely needs them
+        self.fast_mode = os.getenv('FAST_MODE', 'false').lower() == 'true'
+        
+        # Number of reels scraped at the same time, each in its own browser context
+        self.concurrency = max(1, int(os.getenv('CONCURRENCY', str(min(4, num_reels)))))
+        
+        # Browser and login settings, read once here rather than on every call
+        self.use_existing_browser = os.getenv('USE_EXISTING_BROWSER', 'false').lower() == 'true'
+        self.windows_host = os.getenv('WINDOWS_HOST', '172.17.0.1')
+        self.slowmo = browser_pool.SLOWMO
+        self.whisper_backend = os.getenv('WHISPER_BACKEND', 'openai').lower()
+        self.username = os.getenv('INSTAGRAM_USERNAME')
+        self.password = os.getenv('INSTAGRAM_PASSWORD')
+        
+        # Fail before the browser starts if a login will be needed and can't succeed
+        if not (self.username and self.password) and not self.has_fresh_login_state():
+            raise ValueError("Instagram credentials not found in .env file")
+        
         # Only enable keyword checking if we're not in search mode
         self.enable_keyword_check = (not is_search) and os.getenv('ENABLE_KEYWORD_CHECK', 'false').lower() == 'true'
         
@@ -62,11 +241,42 @@ class InstagramReelExtractor:
                 print("Keyword filtering disabled (using search mode)")
             else:
                 print("Keyword checking is disabled")
+        
+        # Compiled once so check_keywords finds every keyword in a single pass over the text
+        self._kw_automaton = build_keyword_automaton(self.keywords)
+        
+        # IDs of reels that already have an output file, filled in by process_reels
+        self._seen = set()
+        
+        # Client for Instagram's JSON API using the browser's login cookies, set up after login
+        self._api_client = None
+        
+        # Client for the caption fallback, created on first use and kept for every reel
+        self._caption_client = None
+        
+        # Media info JSON the reel pages fetch themselves, keyed by page, then shortcode
+        self._media_info: Dict[Page, Dict[str, Dict]] = {}
 
-    def setup_browser(self) -> None:
-        """Initialize browser with randomized properties and persistent profile."""
-        playwright = sync_playwright().start()
+    async def setup_browser(self) -> None:
+        """Connect to the browser and open the main context and page."""
+        if self.use_existing_browser:
+            try:
+                playwright = await browser_pool.get_playwright()
+                self.browser = await playwright.chromium.connect_over_cdp(f'http://{self.windows_host}:9222')
+            except Exception as e:
+                print(f"Connection error: {e}")
+                raise
+        else:
+            # Reuse the already running Chromium instead of launching one per run
+            self.browser = await browser_pool.get_browser()
         
+        # Login, scrolling and URL collection happen on this page
+        self.context = await self.open_context()
+        self.page = await self.context.new_page()
+
+    async def open_context(self) -> BrowserContext:
+        """Get a context with randomized properties on the browser, with resource
+        blocking and media info capture installed."""
         # Random viewport size (common resolutions)
         viewports = [
             {"width": 1920, "height": 1080},
@@ -76,81 +286,85 @@ class InstagramReelExtractor:
         ]
         viewport = random.choice(viewports)
         
-        use_existing_browser = os.getenv('USE_EXISTING_BROWSER', 'false').lower() == 'true'
+        # Restore the saved Instagram session so the login flow can be skipped
+        storage_state = str(STORAGE_STATE_FILE) if self.has_fresh_login_state() else None
+        context_options = dict(
+            storage_state=storage_state,
+            viewport=viewport,
+            locale='en-US',
+            timezone_id='America/New_York',
+            geolocation={'latitude': 40.7128, 'longitude': -74.0060},
+            permissions=['geolocation']
+        )
         
-        if use_existing_browser:
-            windows_host = os.getenv('WINDOWS_HOST', '172.17.0.1')
-            try:
-                self.browser = playwright.chromium.connect_over_cdp(f'http://{windows_host}:9222')
-                context = self.browser.new_context(
-                    viewport=viewport,
-                    user_agent=self.USER_AGENT,
-                    locale='en-US',
-                    timezone_id='America/New_York',
-                    geolocation={'latitude': 40.7128, 'longitude': -74.0060},
-                    permissions=['geolocation']
-                )
-            except Exception as e:
-                print(f"Connection error: {e}")
-                raise
+        if self.use_existing_browser:
+            context = await self.browser.new_context(user_agent=self.USER_AGENT, **context_options)
         else:
-            # Create user data directory if it doesn't exist
-            user_data_dir = Path('browser_profile').absolute()
-            user_data_dir.mkdir(exist_ok=True)
-            
-            # Use launch_persistent_context instead of launch
-            context = playwright.chromium.launch_persistent_context(
-                user_data_dir=str(user_data_dir),
-                headless=os.getenv('BROWSER_HEADLESS', 'false').lower() == 'true',
-                slow_mo=int(os.getenv('BROWSER_SLOWMO', '0')),
-                viewport=viewport,
-                user_agent=self.USER_AGENT,
-                locale='en-US',
-                timezone_id='America/New_York',
-                geolocation={'latitude': 40.7128, 'longitude': -74.0060},
-                permissions=['geolocation']
-            )
-            self.browser = context.browser
+            # An idle context left by a previous run in this process is reused
+            context = await browser_pool.acquire_context(self.USER_AGENT, **context_options)
         
-        self.page = context.new_page()
+        await context.route('**/*', self._block_heavy_resources)
+        context.on('response', self._capture_media_info)
+        return context
+
+    async def release_context(self, context: BrowserContext) -> None:
+        """Close a context from open_context, or hand it back to the pool."""
+        if self.use_existing_browser:
+            await context.close()
+        else:
+            # Detach this run's handlers so a later run can install its own
+            await context.unroute('**/*', self._block_heavy_resources)
+            context.remove_listener('response', self._capture_media_info)
+            await browser_pool.release_context(context, self.USER_AGENT)
 
-    def random_mouse_movement(self) -> None:
-        """Simulate natural mouse movements."""
+    async def _block_heavy_resources(self, route) -> None:
+        """Abort images, video, fonts and tracking beacons; let everything else through."""
+        request = route.request
+        if (request.resource_type in BLOCKED_RESOURCE_TYPES
+                or any(part in request.url for part in BLOCKED_URL_PARTS)):
+            await route.abort()
+        else:
+            await route.continue_()
+
+    async def _capture_media_info(self, response) -> None:
+        """Keep the media info the page loads for itself, so captions don't need extra requests."""
+        url = response.url
+        if '/api/v1/media/' not in url and '/graphql/query' not in url:
+            return
         try:
-            x = random.randint(100, 1000)
-            y = random.randint(100, 700)
-            self.page.mouse.move(x, y, steps=random.randint(5, 10))
+            data = await response.json()
         except Exception:
-            pass
-
-    def wait_for_reel_playback(self) -> None:
-        """Wait for reel playback with natural behavior.
-        Note: This is just for UI interaction simulation.
-        The actual video download and transcription happens separately."""
-        time.sleep(random.uniform(1, 2))  # Initial page load wait
-        
+            return
+        if not isinstance(data, dict):
+            return
         try:
-            # Wait up to 5 seconds to find the video player element
-            video = self.page.locator('video:visible').first
-            video.wait_for(timeout=5000)  # This is just for finding the element
-            
-            # Natural mouse movement to video
-            video_box = video.bounding_box()
-            if video_box:
-                self.page.mouse.move(
-                    video_box['x'] + random.randint(10, int(video_box['width']-10)),
-                    video_box['y'] + random.randint(10, int(video_box['height']-10)),
-                    steps=random.randint(5, 10)
-                )
-            
-            # This wait time is just for appearance - it doesn't affect the download
-            watch_time = random.uniform(3, 5)  # Reduced from 8-15s to 3-5s
-            time.sleep(watch_time)
-            
-        except Exception as e:
-            # Just log and continue, since we already have the video URL
-            print(f"Note: Video element interaction skipped - {str(e)}")
-            time.sleep(random.uniform(1, 2))
+            page = response.frame.page
+        except Exception:
+            # Service worker responses belong to no page
+            return
+        
+        # REST responses have items at the top level, GraphQL ones nest them
+        items = data.get('items')
+        if items is None:
+            items = ((data.get('data') or {})
+                     .get('xdt_api__v1__media__shortcode__web_info') or {}).get('items')
+        for item in items or []:
+            if isinstance(item, dict) and item.get('code'):
+                self._media_info.setdefault(page, {})[item['code']] = item
+
+    async def wait_for_media_info(self, page: Page, reel_id: str, timeout: float = 3.0) -> Optional[Dict]:
+        """Take the media info a page captured for a reel, waiting up to timeout seconds
+        for the page's own request to arrive. Returns None if it never does.
+        Everything else the page captured so far is dropped with it."""
+        deadline = time.monotonic() + timeout
+        while reel_id not in self._media_info.get(page, {}) and time.monotonic() < deadline:
+            await asyncio.sleep(0.1)
+        return self._media_info.pop(page, {}).get(reel_id)
+
+    async def human_pause(self, low: float, high: float) -> None:
+        """Sleep for a random time between low and high seconds, unless FAST_MODE is on."""
+        if not self.fast_mode:
+            await asyncio.sleep(random.uniform(low, high))
 
     def check_keywords(self, text: str, source: str) -> bool:
         """Check if any keywords are present in the text."""
@@ -161,7 +375,7 @@ class InstagramReelExtractor:
             return False
             
         text_lower = text.lower()
-        found_keywords = [k for k in self.keywords if k.lower() in text_lower]
+        found_keywords = sorted({k for _, k in self._kw_automaton.iter(text_lower)})
         if found_keywords:
             print(f"Found keywords in {source}: {found_keywords}")
             return True
@@ -173,16 +387,59 @@ class InstagramReelExtractor:
             return url
 
         # Extract the unique ID after the domain and before the next slash
-        match = re.search(r'instagram\.com/[^/]+/([A-Za-z0-9_-]+)', url)
+        match = REEL_URL_RE.search(url)
         if match:
             reel_id = match.group(1)
             return f"https://www.instagram.com/reels/{reel_id}/"
         return url
 
-    def extract_reel_data(self, reel_url: str) -> Dict:
+    def transcribe_audio(self, audio: Tuple[str, bytes, str], duration: float = 0.0) -> str:
+        """Transcribe in-memory (filename, data, mime_type) audio with Whisper
+        (blocking, run it in a worker thread)."""
+        backend = self.whisper_backend
+        if backend == 'local':
+            # No network, so no rate limit to respect
+            return transcribe_local(audio)
+        if backend == 'transformers':
+            # Batched with the other reels' audio on the GPU; falls through to
+            # the API when there is no GPU to run on
+            batcher = get_batcher()
+            if batcher:
+                return batcher.transcribe(audio[1])
+        
+        attempts = 3
+        for attempt in range(attempts):
+            WHISPER_RATE_LIMIT.acquire(est_tokens=duration * TOKENS_PER_AUDIO_SECOND)
+            try:
+                # No SDK retries here: each attempt has to go through the limiter
+                return OPENAI_CLIENT.with_options(max_retries=0).audio.transcriptions.create(
+                    model="whisper-1",
+                    file=audio,
+                    language="en"
+                ).text
+            except openai.RateLimitError as e:
+                if attempt == attempts - 1:
+                    raise
+                # Hold every worker back for as long as the API asks
+                try:
+                    retry_after = float(e.response.headers.get('retry-after', 10))
+                except ValueError:
+                    retry_after = 10.0
+                print(f"Whisper rate limited, pausing for {retry_after:.0f} seconds...")
+                WHISPER_RATE_LIMIT.pause(retry_after)
+
+    async def extract_reel_data(self, reel_url: str, page: Optional[Page] = None) -> Dict:
         """Extract data from a single reel."""
+        reel = await self.scrape_reel_page(reel_url, page)
+        return await self.transcribe_reel(reel)
+
+    async def scrape_reel_page(self, reel_url: str, page: Optional[Page] = None) -> Dict:
+        """Open a reel in the browser and read its final URL, ID and caption.
+        Returns a dict with 'reel_id', 'url', 'caption', 'video_url' (None if unknown)
+        and 'duration' (0.0 if unknown), plus 'error' on failure."""
+        page = page or self.page
         original_url = self.normalize_reel_url(reel_url)
-        original_reel_id = original_url.split('/')[-2]
+        original_reel_id = reel_shortcode(original_url)
         caption = ""
         current_url = original_url  # <-- Initialize here
         current_reel_id = original_reel_id  # <-- Initialize here
@@ -190,22 +447,27 @@ class InstagramReelExtractor:
         try:
             # Navigate to the reel with longer timeout
             print(f"Navigating to reel: {original_url}")
-            self.page.goto(original_url, wait_until="networkidle", timeout=60000)
-            time.sleep(2)
+            # Instagram never goes network-idle (long polling, beacons), so wait for
+            # the DOM and then for the video element instead of sleeping
+            await page.goto(original_url, wait_until="domcontentloaded", timeout=60000)
+            await page.wait_for_selector('video', state='attached', timeout=8000)
             
             # Get the current URL and log if there's a redirect
-            current_url = self.page.url
-            current_reel_id = current_url.split('/')[-2]
+            current_url = page.url
+            current_reel_id = reel_shortcode(current_url)
             
             # If redirected, try to go back to the intended reel
             if current_reel_id != original_reel_id:
                 print(f"Note: Instagram redirected from reel {original_reel_id} to {current_reel_id}")
                 print("Attempting to navigate back to the intended reel using ArrowUp...")
-                self.page.keyboard.press('ArrowUp')
-                time.sleep(2)
+                await page.keyboard.press('ArrowUp')
+                try:
+                    await page.wait_for_url(lambda u: f"/{original_reel_id}/" in u, timeout=5000)
+                except PlaywrightTimeout:
+                    pass
                 # Check if we are back to the original reel
-                back_url = self.page.url
-                back_reel_id = back_url.split('/')[-2]
+                back_url = page.url
+                back_reel_id = reel_shortcode(back_url)
                 if back_reel_id == original_reel_id:
                     print(f"Successfully navigated back to the intended reel: {original_reel_id}")
                     current_url = back_url
@@ -213,69 +475,147 @@ class InstagramReelExtractor:
                 else:
                     print(f"Failed to navigate back to the intended reel. Continuing with redirected reel: {current_reel_id}")
             
-            # Wait for the page content to load
-            self.page.wait_for_selector('video', timeout=45000)
-            time.sleep(1)  # Short pause to ensure page is stable
+            # Use the media info the page fetches for itself; it usually lands shortly
+            # after the video element, and is far cheaper than the HTML/API fallbacks
+            video_url = None
+            duration = 0.0
+            media_info = await self.wait_for_media_info(page, current_reel_id)
+            if media_info:
+                caption = (media_info.get('caption') or {}).get('text') or ""
+                duration = float(media_info.get('video_duration') or 0.0)
+                video_versions = media_info.get('video_versions') or []
+                if video_versions:
+                    video_url = video_versions[0].get('url')
+            # The .mp4 the video element asks for is often a video-only range or DASH
+            # segment, so without media info prepare_audio leaves the page URL to yt-dlp
             
             # Try to get the caption using multiple methods
             try:
+                # The page HTML is fetched once and shared by the media ID lookup and the regex
+                page_content = await page.content() if not caption else ""
+                
                 # Try API methods first
-                api_data = self.get_reel_caption(current_url)  # Use the redirected URL
-                if api_data and api_data.get('caption'):
-                    caption = api_data['caption']
+                if not caption:
+                    api_data = await self.get_reel_caption(current_url, page, page_content)  # Use the redirected URL
+                    if api_data and api_data.get('caption'):
+                        caption = api_data['caption']
                 
-                # If API methods fail, try page scraping
+                # Then the caption JSON embedded in the HTML, matched in-process
                 if not caption:
-                    # Try multiple selector patterns that Instagram uses
-                    selectors = [
-                        'span[class*="caption"]',
-                        'span[class*="Caption"]',
-                        'div[class*="caption"]',
-                        'div[class*="Caption"]'
-                    ]
-                    
-                    for selector in selectors:
-                        try:
-                            caption_element = self.page.locator(selector).first
-                            if caption_element:
-                                caption = caption_element.inner_text()
-                                if caption:
-                                    break
-                        except Exception:
-                            continue
+                    match = CAPTION_RE.search(page_content)
+                    if match:
+                        caption = json.loads(f'"{match.group(1)}"')
+                
+                # If those fail, try the rendered caption elements
+                if not caption:
+                    # Try multiple selector patterns that Instagram uses, all in one
+                    # round-trip to the browser instead of one per element
+                    caption = await page.evaluate(self.CAPTION_JS, list(self.CAPTION_SELECTORS)) or ""
                 
                 if caption:
-                    print(f"\n{datetime.now().strftime('%Y-%m-%d %H:%M:%S')} - Successfully fetched caption")
+                    log.info("Successfully fetched caption")
                     print(f"Caption: {caption}\n")
                 else:
-                    print(f"\n{datetime.now().strftime('%Y-%m-%d %H:%M:%S')} - Warning: Could not find caption\n")
+                    log.warning("Warning: Could not find caption")
                     
             except Exception as e:
-                print(f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')} - Warning: Error fetching caption: {str(e)}")
+                log.warning(f"Warning: Error fetching caption: {str(e)}")
             
-            # Download video and extract audio for the current URL
-            video_path, _ = download_video(current_url, self.output_dir)  # Use the redirected URL
-            audio_path = extract_audio(video_path, self.output_dir)
+            return {
+                "reel_id": current_reel_id,
+                "url": current_url,
+                "caption": caption,
+                "video_url": video_url,
+                "duration": duration
+            }
             
-            # Get transcription
-            client = openai.OpenAI()
-            with open(str(audio_path), "rb") as audio_file:
-                transcription = client.audio.transcriptions.create(
-                    model="whisper-1",
-                    file=audio_file,
-                    language="en"
-                ).text
+        except Exception as e:
+            log.error(f"Error processing reel {current_url}: {str(e)}")
+            return {"reel_id": current_reel_id, "url": current_url, "caption": caption, "error": str(e)}
+
+    async def prepare_audio(self, reel: Dict) -> Dict:
+        """Fetch the audio for a reel scraped by scrape_reel_page.
+        Returns the reel with 'audio' and 'duration' added, or with 'error' on failure."""
+        # A failed scrape is recorded as is; there is nothing worth downloading
+        if 'error' in reel:
+            return reel
+        
+        current_url = reel['url']
+        try:
+            # These steps block on subprocesses and HTTP, so run them in
+            # executors to keep other reels moving
+            loop = asyncio.get_running_loop()
+            audio = None
+            duration = reel.get('duration', 0.0)
             
-            print(f"\n{datetime.now().strftime('%Y-%m-%d %H:%M:%S')} - Transcription: {transcription}\n")
+            if reel.get('video_url'):
+                # Stream the CDN file straight through ffmpeg, skipping the disk entirely
+                try:
+                    audio = await loop.run_in_executor(FFMPEG_POOL, fetch_and_extract, reel['video_url'])
+                except Exception as e:
+                    print(f"Streaming audio failed, downloading the video instead: {str(e)}")
             
-            # Clean up temporary files
-            cleanup_temp_files(video_path)
-            cleanup_temp_files(audio_path)
+            if audio is None:
+                # Download video and extract audio for the current URL
+                # Let yt-dlp resolve the reel page itself; the CDN link may be what just failed
+                video_path, _ = await asyncio.to_thread(download_video, current_url, self.output_dir)  # Use the redirected URL
+                # One ffprobe for both codec and duration, then the audio is piped
+                # from ffmpeg straight into memory, never touching disk
+                codec, duration = await loop.run_in_executor(FFMPEG_POOL, probe_audio, video_path)
+                audio = await loop.run_in_executor(FFMPEG_POOL, extract_audio_bytes, video_path, codec)
+                
+                # Clean up temporary files
+                await asyncio.to_thread(cleanup_temp_files, video_path)
+            
+            return {**reel, "audio": audio, "duration": duration}
+        except Exception as e:
+            log.error(f"Error processing reel {current_url}: {str(e)}")
+            return {**reel, "error": str(e)}
+
+    async def transcribe_reel(self, reel: Dict) -> Dict:
+        """Transcribe a reel scraped by scrape_reel_page and build its output record,
+        fetching its audio first unless prepare_audio already did.
+        Needs no browser page, so it can run while the browser moves on to the next reel."""
+        # A cached transcription saves both the audio fetch and the Whisper call
+        transcription = reel.get('transcription')
+        if transcription is None:
+            transcription = self.read_cache('transcriptions', reel['reel_id'])
+        if transcription is None and 'error' not in reel and 'audio' not in reel:
+            reel = await self.prepare_audio(reel)
+        
+        current_url = reel['url']
+        current_reel_id = reel['reel_id']
+        caption = reel['caption']
+        
+        if 'error' in reel:
+            return {
+                "reel_id": current_reel_id,
+                "url": current_url,
+                "timestamp": datetime.now().isoformat(),
+                "transcription": "",
+                "caption": caption,
+                "error": reel['error']
+            }
+        
+        try:
+            # Get transcription
+            if transcription is None:
+                # Reposts of the same clip have identical audio, so it is cached by content too
+                audio_digest = hashlib.blake2b(reel['audio'][1], digest_size=16).hexdigest()
+                transcription = self.read_cache('audio', audio_digest)
+                if transcription is None:
+                    transcription = await asyncio.get_running_loop().run_in_executor(
+                        WHISPER_POOL, self.transcribe_audio, reel['audio'], reel['duration']
+                    )
+                    self.write_cache('audio', audio_digest, transcription)
+                self.write_cache('transcriptions', current_reel_id, transcription)
+            
+            log.info(f"Transcription: {transcription}")
             
             # Check keywords in caption first
             if caption and not self.check_keywords(caption, "caption"):
                 if not transcription or not self.check_keywords(transcription, "transcription"):
-                    print(f"\n{datetime.now().strftime('%Y-%m-%d %H:%M:%S')} - Skipping reel {current_url}: No matching keywords found in caption or transcription")
+                    log.info(f"Skipping reel {current_url}: No matching keywords found in caption or transcription")
                     return {
                         "reel_id": current_reel_id,
                         "url": current_url,
@@ -294,86 +634,161 @@ class InstagramReelExtractor:
             }
             
         except KeywordNotFoundError as e:
-            print(f"\n{datetime.now().strftime('%Y-%m-%d %H:%M:%S')} - Skipping reel {current_url}: {str(e)}")
+            log.info(f"Skipping reel {current_url}: {str(e)}")
             return {
                 "reel_id": current_reel_id,
                 "url": current_url,
                 "timestamp": datetime.now().isoformat(),
-                "transcription": transcription if 'transcription' in locals() else "",
+                "transcription": transcription or "",
                 "caption": caption,
                 "skipped": str(e)
             }
         except Exception as e:
-            print(f"\n{datetime.now().strftime('%Y-%m-%d %H:%M:%S')} - Error processing reel {current_url}: {str(e)}")
+            log.error(f"Error processing reel {current_url}: {str(e)}")
             return {
                 "reel_id": current_reel_id,
                 "url": current_url,
                 "timestamp": datetime.now().isoformat(),
-                "transcription": transcription if 'transcription' in locals() else "",
+                "transcription": transcription or "",
                 "caption": caption,
                 "error": str(e)
             }
 
-    def get_reel_caption(self, reel_url: str) -> Dict:
-        """Get reel caption using Instagram's API."""
-        client = httpx.Client(
+    async def open_api_client(self) -> None:
+        """Create the JSON API client from the logged-in browser context's cookies."""
+        cookies = {c['name']: c['value'] for c in await self.context.cookies('https://www.instagram.com')}
+        self._api_client = httpx.AsyncClient(
             headers={
                 "User-Agent": self.USER_AGENT,
                 "Accept": "*/*",
                 "Accept-Language": "en-US,en;q=0.9",
-                # Remove brotli from accepted encodings
-                "Accept-Encoding": "gzip, deflate",
                 "Referer": "https://www.instagram.com/",
                 "X-IG-App-ID": "936619743392459",
-                "X-Requested-With": "XMLHttpRequest",
                 "X-ASBD-ID": "198387",
-                "Cookie": f"sessionid={os.getenv('INSTAGRAM_SESSION_ID')}",
+                "X-CSRFToken": cookies.get('csrftoken', ''),
             },
+            cookies=cookies,
             timeout=30.0,
-            follow_redirects=True
+            http2=True
         )
 
+    async def fetch_reel_metadata(self, reel_url: str) -> Optional[Dict]:
+        """Get a reel's caption, video URL and duration straight from the JSON API.
+        Returns the same dict as scrape_reel_page, or None when the API can't be used
+        (rate limited, login wall, unknown reel) and the page has to be loaded instead."""
+        if not self._api_client:
+            return None
+        
+        reel_id = reel_shortcode(self.normalize_reel_url(reel_url))
+        try:
+            media_id = shortcode_to_media_id(reel_id)
+            response = await self._api_client.get(f"https://www.instagram.com/api/v1/media/{media_id}/info/")
+            if response.status_code != 200 or 'application/json' not in response.headers.get('content-type', ''):
+                print(f"Media API returned {response.status_code} for {reel_id}, loading the page instead")
+                return None
+            
+            items = response.json().get('items') or []
+            if not items:
+                return None
+            item = items[0]
+        except Exception as e:
+            print(f"Media API error for {reel_id}, loading the page instead: {str(e)}")
+            return None
+        
+        video_versions = item.get('video_versions') or []
+        return {
+            "reel_id": item.get('code') or reel_id,
+            "url": f"https://www.instagram.com/reels/{item.get('code') or reel_id}/",
+            "caption": (item.get('caption') or {}).get('text') or "",
+            "video_url": video_versions[0].get('url') if video_versions else None,
+            "duration": float(item.get('video_duration') or 0.0)
+        }
+
+    def get_caption_client(self) -> httpx.AsyncClient:
+        """Return the caption API client, creating it on first use so its connections
+        are kept alive across reels."""
+        if self._caption_client is None:
+            # In the cookie jar rather than a fixed header, so it goes to both instagram.com
+            # hosts and is left out entirely when no session ID is configured
+            cookies = httpx.Cookies()
+            session_id = os.getenv('INSTAGRAM_SESSION_ID')
+            if session_id:
+                cookies.set('sessionid', session_id, domain='.instagram.com')
+            self._caption_client = httpx.AsyncClient(
+                headers={
+                    "User-Agent": self.USER_AGENT,
+                    "Accept": "*/*",
+                    "Accept-Language": "en-US,en;q=0.9",
+                    "Referer": "https://www.instagram.com/",
+                    "X-IG-App-ID": "936619743392459",
+                    "X-Requested-With": "XMLHttpRequest",
+                    "X-ASBD-ID": "198387",
+                },
+                cookies=cookies,
+                timeout=30.0,
+                follow_redirects=True,
+                http2=True,
+                limits=httpx.Limits(max_keepalive_connections=20, max_connections=40)
+            )
+        return self._caption_client
+
+    async def get_reel_caption(self, reel_url: str, page: Optional[Page] = None, page_content: str = "") -> Dict:
+        """Get reel caption using Instagram's API. page_content, if given, is the
+        page HTML the caller already fetched."""
+        client = self.get_caption_client()
         try:
             # First get the media ID from the page
-            media_id = self.get_media_id(reel_url)
+            media_id = await self.get_media_id(reel_url, page, page_content)
             if not media_id:
                 print("Could not find media ID")
                 return {"caption": ""}
 
-            # Use only the endpoint that consistently works
-            api_url = f"https://i.instagram.com/api/v1/media/{media_id}/info/"
-            
+            # Ask both hosts at once and use whichever answers first with the reel, so
+            # a slow or rate-limited one doesn't hold up the other
             print(f"Fetching caption from API...")
-            response = client.get(api_url)
-            
-            if response.status_code == 200:
-                data = response.json()
-                if 'items' in data and data['items']:
-                    caption_data = data['items'][0].get('caption', {})
-                    if isinstance(caption_data, dict):
-                        return {"caption": caption_data.get('text', '')}
-                    return {"caption": caption_data or ''}
+            pending = {
+                asyncio.create_task(client.get(f"https://{host}/api/v1/media/{media_id}/info/"))
+                for host in ('i.instagram.com', 'www.instagram.com')
+            }
+            try:
+                while pending:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        # Any failure on one host is a miss; keep waiting for the other.
+                        # A logged-out request can be redirected to the HTML login page,
+                        # so a 200 isn't necessarily JSON
+                        try:
+                            response = task.result()
+                            if response.status_code != 200:
+                                continue
+                            items = response.json().get('items') or []
+                        except Exception as e:
+                            print(f"Caption request failed: {str(e)}")
+                            continue
+                        if items:
+                            caption_data = items[0].get('caption', {})
+                            if isinstance(caption_data, dict):
+                                return {"caption": caption_data.get('text', '')}
+                            return {"caption": caption_data or ''}
+            finally:
+                for task in pending:
+                    task.cancel()
             
             return {"caption": ""}
             
         except Exception as e:
-            print(f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')} - Error fetching caption: {str(e)}")
+            log.error(f"Error fetching caption: {str(e)}")
             return {"caption": ""}
 
-    def get_media_id(self, reel_url: str) -> Optional[str]:
-        """Get the internal media ID from the page source."""
+    async def get_media_id(self, reel_url: str, page: Optional[Page] = None, page_content: str = "") -> Optional[str]:
+        """Get the internal media ID from the page source, fetching it unless given."""
+        page = page or self.page
         try:
             # Look for the media ID in the page source
-            page_content = self.page.content()
-            
-            patterns = [
-                r'"media_id":"(\d+)"',
-                r'instagram://media\?id=(\d+)',
-                r'"id":"(\d+)"',
-            ]
+            page_content = page_content or await page.content()
             
-            for pattern in patterns:
-                match = re.search(pattern, page_content)
+            for pattern in MEDIA_ID_PATTERNS:
+                match = pattern.search(page_content)
                 if match:
                     media_id = match.group(1)
                     print(f"Found media ID: {media_id}")
@@ -384,104 +799,202 @@ class InstagramReelExtractor:
             print(f"Error getting media ID: {str(e)}")
             return None
 
-    def scroll_to_next_reel(self) -> str:
+    async def wait_for_reel_change(self, prev_url: str) -> None:
+        """Wait until the page URL moves to a different reel, or give up after 5 seconds."""
+        try:
+            await self.page.wait_for_url(lambda u: '/reel' in u and u != prev_url, timeout=5000)
+        except PlaywrightTimeout:
+            pass
+
+    async def scroll_to_next_reel(self) -> str:
         """Smooth scroll to next reel."""
-        time.sleep(random.uniform(0.5, 1))
-        
         # Store current URL before scrolling
         current_url = self.page.url
-        current_reel_id = current_url.split('/')[-2]
+        current_reel_id = reel_shortcode(current_url)
         
         # Press Down Arrow to move to next reel
-        self.page.keyboard.press('ArrowDown')
-        
-        # Wait for URL to change and stabilize
-        time.sleep(2)
+        await self.page.keyboard.press('ArrowDown')
+        await self.wait_for_reel_change(current_url)
         
         # Get the new URL after scrolling
         new_url = self.page.url
-        new_reel_id = new_url.split('/')[-2]
+        new_reel_id = reel_shortcode(new_url)
         
         # Make sure we actually moved to a different reel
         max_attempts = 3
         attempts = 0
         while new_reel_id == current_reel_id and attempts < max_attempts:
             print(f"Reel didn't change, trying scroll again...")
-            self.page.keyboard.press('ArrowDown')
-            time.sleep(2)
+            await self.page.keyboard.press('ArrowDown')
+            await self.wait_for_reel_change(current_url)
             new_url = self.page.url
-            new_reel_id = new_url.split('/')[-2]
+            new_reel_id = reel_shortcode(new_url)
             attempts += 1
         
         if new_reel_id == current_reel_id:
             raise ValueError(f"Failed to scroll to new reel after {max_attempts} attempts")
         
-        print(f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')} - Scrolled to new reel: {new_url}")
+        log.info(f"Scrolled to new reel: {new_url}")
+        # Short randomized tail once the change is seen, instead of a fixed pause before it
+        await self.human_pause(0.3, 0.7)
         return new_url
 
-    def login_to_instagram(self) -> None:
+    def has_fresh_login_state(self) -> bool:
+        """Whether a saved session exists and is recent enough to be trusted."""
+        try:
+            return time.time() - STORAGE_STATE_FILE.stat().st_mtime < STORAGE_STATE_MAX_AGE
+        except FileNotFoundError:
+            return False
+
+    async def has_session_cookie(self) -> bool:
+        """Whether the context holds an Instagram session cookie, from the saved state
+        or an earlier run's pooled context. Checked locally, without a request."""
+        cookies = await self.context.cookies('https://www.instagram.com')
+        return any(c['name'] == 'sessionid' and c['value'] for c in cookies)
+
+    async def session_is_valid(self) -> bool:
+        """Check the restored session with a single request instead of loading the homepage.
+        The account settings page answers 200 when logged in and redirects to the login page otherwise."""
+        try:
+            response = await self.context.request.get(
+                'https://www.instagram.com/accounts/edit/', max_redirects=0, timeout=10000
+            )
+            return response.status == 200
+        except Exception as e:
+            print(f"Could not check saved session: {str(e)}")
+            return False
+
+    async def save_login_state(self) -> None:
+        """Save the session cookies so later runs start out logged in."""
+        try:
+            await self.context.storage_state(path=str(STORAGE_STATE_FILE))
+        except Exception as e:
+            print(f"Could not save login state: {str(e)}")
+
+    def url_plan_path(self) -> Path:
+        """File caching the reel URLs collected from the current start reel, one per line
+        like a --url file. Not .json, so it isn't mistaken for a reel record."""
+        key = hashlib.sha1(self.start_input.encode()).hexdigest()
+        return self.output_dir / f".plan-{key}.txt"
+
+    def load_url_plan(self) -> Optional[List[str]]:
+        """Return the cached reel URLs for the start reel, or None if there are none
+        recent enough or they don't cover num_reels."""
+        path = self.url_plan_path()
+        try:
+            if time.time() - path.stat().st_mtime >= URL_PLAN_MAX_AGE:
+                return None
+            urls = path.read_text().split()
+        except FileNotFoundError:
+            return None
+        return urls[:self.num_reels] if len(urls) >= self.num_reels else None
+
+    def save_url_plan(self, urls: List[str]) -> None:
+        """Cache the collected reel URLs so a re-run can skip scrolling the feed."""
+        try:
+            self.url_plan_path().write_text('\n'.join(urls) + '\n')
+        except OSError as e:
+            print(f"Could not save reel URL plan: {str(e)}")
+
+    async def gather_reel_urls(self, n: int, on_url: Optional[Callable[[str], Awaitable[None]]] = None) -> List[str]:
+        """Collect up to n unique reel URLs by scrolling down from the start reel in one sweep.
+        on_url, if given, is awaited with each URL as soon as it is found."""
+        await self.page.goto(self.start_input, wait_until="domcontentloaded", timeout=60000)
+        await self.page.wait_for_selector('video', state='attached', timeout=8000)
+        
+        # The start reel itself comes first even if Instagram redirected away from it
+        urls = [self.start_input]
+        seen = {self.start_input}
+        if on_url:
+            await on_url(self.start_input)
+        
+        # Bounded so a feed that keeps looping back on itself can't scroll forever
+        for _ in range(n * 2):
+            if len(urls) >= n:
+                break
+            try:
+                url = self.normalize_reel_url(await self.scroll_to_next_reel())
+            except Exception as e:
+                print(f"Error scrolling to next reel: {str(e)}")
+                break
+            if url not in seen:
+                seen.add(url)
+                urls.append(url)
+                if on_url:
+                    await on_url(url)
+        
+        return urls
+
+    async def login_to_instagram(self) -> None:
         """Login to Instagram with credentials from env."""
         try:
             print("Checking login status...")
-            # Go to Instagram homepage
-            self.page.goto('https://www.instagram.com/', timeout=60000)
-            time.sleep(random.uniform(1, 2))
+            if await self.has_session_cookie() and await self.session_is_valid():
+                print("Already logged in to Instagram (saved session)")
+                return
+            
+            # Go to Instagram homepage and wait for either the feed or the login form
+            await self.page.goto('https://www.instagram.com/', wait_until="domcontentloaded", timeout=60000)
+            try:
+                await self.page.wait_for_selector(
+                    'main[role="main"], input[name="username"]', state='visible', timeout=8000
+                )
+            except PlaywrightTimeout:
+                pass
             
             # Check if we're already logged in by looking for typical logged-in elements
             try:
                 # Look for elements that indicate we're logged in
                 is_logged_in = (
-                    not self.page.get_by_text('Log in').is_visible() and 
+                    not await self.page.get_by_text('Log in').is_visible() and 
                     not 'accounts/login' in self.page.url
                 )
                 
                 if is_logged_in:
                     print("Already logged in to Instagram")
+                    await self.save_login_state()
                     return
             except Exception:
                 pass
             
             # If we reach here, we need to log in
             print("Not logged in. Starting login process...")
-            username = os.getenv('INSTAGRAM_USERNAME')
-            password = os.getenv('INSTAGRAM_PASSWORD')
-            
-            if not username or not password:
+            if not self.username or not self.password:
                 raise ValueError("Instagram credentials not found in .env file")
             
             # Go to login page
-            self.page.goto('https://www.instagram.com/accounts/login/', timeout=60000)
-            time.sleep(random.uniform(1, 2))
+            await self.page.goto('https://www.instagram.com/accounts/login/', wait_until="domcontentloaded", timeout=60000)
             
             print("Waiting for login form...")
-            self.page.wait_for_selector('input[name="username"]', timeout=60000)
+            await self.page.wait_for_selector('input[name="username"]', timeout=60000)
             
             # Fill in username
             print("Filling username...")
-            self.page.fill('input[name="username"]', username)
-            time.sleep(random.uniform(0.3, 0.7))
+            await self.page.fill('input[name="username"]', self.username)
+            await self.human_pause(0.3, 0.7)
             
             # Fill in password
             print("Filling password...")
-            self.page.fill('input[name="password"]', password)
-            time.sleep(random.uniform(0.3, 0.7))
+            await self.page.fill('input[name="password"]', self.password)
+            await self.human_pause(0.3, 0.7)
             
             # Click login button
             print("Clicking login button...")
-            self.page.click('button[type="submit"]')
+            await self.page.click('button[type="submit"]')
             
-            # Wait for navigation and login to complete
+            # Wait for navigation and login to complete. Instagram keeps a websocket
+            # open, so networkidle would only fire at the timeout
             print("Waiting for login to complete...")
-            self.page.wait_for_load_state('networkidle', timeout=60000)
-            time.sleep(random.uniform(2, 3))
+            await self.page.wait_for_url(lambda url: 'accounts/login' not in url, timeout=60000)
+            await self.page.wait_for_selector('main[role="main"]', state='visible', timeout=8000)
             
             # Handle "Save Login Info" popup if it appears
             try:
                 print("Checking for 'Save Login Info' popup...")
                 save_info_button = self.page.get_by_text('Not Now', timeout=10000)
                 if save_info_button:
-                    save_info_button.click()
-                    time.sleep(random.uniform(0.5, 1))
+                    await save_info_button.click()
+                    await self.human_pause(0.5, 1)
             except Exception:
                 print("No 'Save Login Info' popup found")
                 pass
@@ -491,20 +1004,20 @@ class InstagramReelExtractor:
                 print("Checking for notifications popup...")
                 notif_button = self.page.get_by_text('Not Now', timeout=10000)
                 if notif_button:
-                    notif_button.click()
-                    time.sleep(random.uniform(0.5, 1))
+                    await notif_button.click()
+                    await self.human_pause(0.5, 1)
             except Exception:
                 print("No notifications popup found")
                 pass
             
             print("Successfully logged into Instagram")
-            time.sleep(random.uniform(1, 2))
+            await self.save_login_state()
             
         except Exception as e:
             print(f"Login error: {str(e)}")
             print("Current URL:", self.page.url)
             print("Taking screenshot of error state...")
-            self.page.screenshot(path="login_error.png")
+            await self.page.screenshot(path="login_error.png")
             raise
 
     def get_google_search_url(self, keyword: str, start: int = 0, filters: Dict = None) -> str:
@@ -540,7 +1053,7 @@ class InstagramReelExtractor:
         
         return "https://www.google.com/search", params
 
-    def search_reels(self) -> str:
+    async def search_reels(self) -> str:
         """Search for reels using Google and return the first valid reel URL."""
         try:
             # Parse advanced filters from environment variables or command line arguments
@@ -560,11 +1073,11 @@ class InstagramReelExtractor:
             
             # Create a new browser page specifically for Google search
             print("Creating new page for Google search...")
-            search_page = self.page.context.new_page()
+            search_page = await self.page.context.new_page()
             
             try:
                 # Get reel URLs from Google search
-                reel_urls = self.get_reel_urls_from_google(
+                reel_urls = await self.get_reel_urls_from_google(
                     self.start_input,
                     self.num_reels,
                     filters=filters,
@@ -572,7 +1085,7 @@ class InstagramReelExtractor:
                 )
             finally:
                 # Clean up the search page
-                search_page.close()
+                await search_page.close()
             
             if not reel_urls:
                 raise ValueError(f"No reels found for keyword: {self.start_input}")
@@ -604,57 +1117,50 @@ class InstagramReelExtractor:
         ]
         return random.choice(user_agents)
 
-    def simulate_human_behavior(self, page: Page) -> None:
+    async def simulate_human_behavior(self, page: Page) -> None:
         """Simulate human-like behavior on the page."""
         try:
             # Random scroll
             scroll_amount = random.randint(300, 700)
-            page.mouse.wheel(0, scroll_amount)
-            time.sleep(random.uniform(1, 2))
+            await page.mouse.wheel(0, scroll_amount)
+            await self.human_pause(1, 2)
             
             # Random mouse movements
             for _ in range(random.randint(2, 4)):
                 x = random.randint(100, 800)
                 y = random.randint(100, 600)
-                page.mouse.move(x, y, steps=random.randint(5, 10))
-                time.sleep(random.uniform(0.5, 1))
+                await page.mouse.move(x, y, steps=random.randint(5, 10))
+                await self.human_pause(0.5, 1)
             
             # Sometimes move mouse to a link but don't click
-            links = page.query_selector_all('a')
+            links = await page.query_selector_all('a')
             if links:
                 random_link = random.choice(links)
-                box = random_link.bounding_box()
+                box = await random_link.bounding_box()
                 if box:
-                    page.mouse.move(
+                    await page.mouse.move(
                         box['x'] + box['width'] / 2,
                         box['y'] + box['height'] / 2,
                         steps=random.randint(5, 10)
                     )
-                    time.sleep(random.uniform(0.5, 1))
+                    await self.human_pause(0.5, 1)
         except Exception as e:
             print(f"Error during human behavior simulation: {e}")
 
-    def wait_for_human_verification(self, page: Page) -> bool:
+    async def wait_for_human_verification(self, page: Page) -> bool:
         """Wait for human to solve CAPTCHA."""
         print("\n=== CAPTCHA/Human Verification Detected! ===")
         print("Please solve the verification manually in the browser window.")
         print("Press Enter after you've completed the verification...")
         
-        # Wait for user input
-        input()
+        # Wait for user input without blocking the event loop
+        await asyncio.to_thread(input)
         
         # Check if we can proceed
         try:
             # Try to find common CAPTCHA elements
-            captcha_selectors = [
-                'iframe[src*="recaptcha"]',
-                'iframe[src*="captcha"]',
-                '#captcha',
-                '.g-recaptcha',
-            ]
-            
-            for selector in captcha_selectors:
-                if page.query_selector(selector):
+            for selector in self.CAPTCHA_SELECTORS:
+                if await page.query_selector(selector):
                     print("CAPTCHA still detected. Please complete the verification...")
                     return False
             
@@ -662,7 +1168,7 @@ class InstagramReelExtractor:
         except Exception:
             return False
 
-    def get_reel_urls_from_google(self, keyword: str, num_results: int = 10, filters: Dict = None, search_page: Page = None) -> List[str]:
+    async def get_reel_urls_from_google(self, keyword: str, num_results: int = 10, filters: Dict = None, search_page: Page = None) -> List[str]:
         """Get Instagram reel URLs from Google search results with pagination."""
         print(f"Searching Google for Instagram reels about: {keyword}")
         
@@ -677,7 +1183,7 @@ class InstagramReelExtractor:
         try:
             while len(reel_urls) < num_results:  # Keep going until we have enough reels
                 # Update user agent for each page
-                search_page.set_extra_http_headers({
+                await search_page.set_extra_http_headers({
                     'User-Agent': self.get_random_user_agent(),
                     'Accept-Language': 'en-US,en;q=0.9',
                     'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
@@ -693,24 +1199,29 @@ class InstagramReelExtractor:
                 print(f"Search URL: {search_url}")
                 
                 # Navigate to the search URL
-                search_page.goto(search_url, wait_until="networkidle")
-                time.sleep(2)  # Short wait for page stability
+                await search_page.goto(search_url, wait_until="domcontentloaded")
+                try:
+                    # Results, or Google's verification form
+                    await search_page.wait_for_selector('#search, form#captcha-form', timeout=8000)
+                except PlaywrightTimeout:
+                    pass
                 
                 # Check for CAPTCHA/verification
-                if any(text in search_page.content().lower() 
+                page_text = (await search_page.content()).lower()
+                if any(text in page_text 
                       for text in ['captcha', 'unusual traffic', 'verify you\'re a human']):
                     print("\nDetected potential CAPTCHA or verification...")
-                    while not self.wait_for_human_verification(search_page):
+                    while not await self.wait_for_human_verification(search_page):
                         print("Verification not completed. Please try again...")
-                        time.sleep(2)
+                        await asyncio.sleep(2)
                     print("Verification completed! Continuing with search...")
                 
                 # Extract reel links
-                new_links = search_page.query_selector_all('a[href*="instagram.com/reel"]')
+                new_links = await search_page.query_selector_all('a[href*="instagram.com/reel"]')
                 page_urls = []
                 
                 for link in new_links:
-                    url = link.get_attribute('href')
+                    url = await link.get_attribute('href')
                     if url:
                         # Clean up and normalize the URL
                         if '?' in url:
@@ -732,7 +1243,7 @@ class InstagramReelExtractor:
                 # Move to next page
                 if len(reel_urls) < num_results:
                     start_index += 10
-                    time.sleep(2)  # Short delay between pages
+                    await asyncio.sleep(2)  # Short delay between pages
                 else:
                     break
             
@@ -754,31 +1265,223 @@ class InstagramReelExtractor:
             print(f"Error during Google search: {str(e)}")
             return reel_urls[:num_results] if reel_urls else []
 
-    def process_reels(self) -> None:
+    async def scrape_reel_url(self, url: str, idx: int, total: int, context: BrowserContext) -> Optional[Dict]:
+        """Scrape one reel, on a new page in the given context if the API can't provide it.
+        Returns the scraped reel, or None if it already has an output file."""
+        log.info(f"Processing reel {idx}/{total}")
+        
+        # Skip known reels before spending a page load on them
+        url_reel_id = reel_shortcode(url)
+        if url_reel_id in self._seen:
+            print(f"Reel {url_reel_id} already exists in {self.output_dir}, skipping.")
+            return None
+        
+        # A previous run got this far already; nothing left to fetch from Instagram
+        caption = self.read_cache('captions', url_reel_id)
+        transcription = self.read_cache('transcriptions', url_reel_id)
+        if caption and transcription is not None:
+            print(f"Using cached caption and transcription for {url_reel_id}")
+            return {"reel_id": url_reel_id, "url": url, "caption": caption, "transcription": transcription}
+        
+        # The JSON API has everything the page would give us, without rendering it
+        reel = await self.fetch_reel_metadata(url)
+        if reel is None:
+            page = await context.new_page()
+            try:
+                reel = await self.scrape_reel_page(url, page)
+            finally:
+                # Drop whatever arrived for this page after its reel was read
+                self._media_info.pop(page, None)
+                await page.close()
+        
+        # A redirect may have landed on a reel we already have
+        if reel['reel_id'] in self._seen:
+            print(f"Reel {reel['reel_id']} already exists in {self.output_dir}, skipping.")
+            return None
+        if reel.get('caption') and 'error' not in reel:
+            self.write_cache('captions', reel['reel_id'], reel['caption'])
+        
+        # Add delay between reels; held inside the stage so each scraper paces itself
+        # while the other workers keep going
+        if idx < total and not self.fast_mode:
+            delay = random.uniform(2, 3)
+            print(f"Waiting {delay:.1f} seconds before next reel...")
+            await asyncio.sleep(delay)
+        return reel
+
+    def read_cache(self, kind: str, reel_id: str) -> Optional[str]:
+        """Return the cached caption or transcription ('captions' / 'transcriptions') for a reel,
+        or the transcription for an audio digest ('audio'), if any."""
+        try:
+            return (self.cache_dir / kind / f"{reel_id}.txt").read_text(encoding='utf-8')
+        except FileNotFoundError:
+            return None
+
+    def has_transcription(self, reel: Dict) -> bool:
+        """Whether the reel's transcription is already known, on the reel or in the cache."""
+        if 'transcription' in reel:
+            return True
+        return self.read_cache('transcriptions', reel['reel_id']) is not None
+
+    def write_cache(self, kind: str, reel_id: str, text: str) -> None:
+        """Cache a caption or transcription. Written to a temp file and renamed into
+        place, so concurrent workers never read a partial file."""
+        try:
+            path = self.cache_dir / kind / f"{reel_id}.txt"
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+            tmp_path.write_text(text, encoding='utf-8')
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Could not cache {kind} for {reel_id}: {str(e)}")
+
+    def save_reel(self, reel_data: Dict) -> str:
+        """Write a reel's output record. Returns 'new', 'skipped' or 'error' for the run summary."""
+        reel_id = reel_data['reel_id']
+        output_file = self.output_dir / f"{reel_id}.json"
+        if reel_id in self._seen:
+            print(f"Reel {reel_id} already exists in {output_file}, skipping.")
+            return 'skipped'
+        try:
+            output_file.write_bytes(orjson.dumps(reel_data, option=orjson.OPT_INDENT_2))
+        except Exception as e:
+            print(f"Error saving reel {reel_id}: {str(e)}")
+            return 'error'
+        self._seen.add(reel_id)
+        print(f"Saved new reel data to {output_file}")
+        return 'new'
+
+    async def run_pipeline(self, urls: Optional[List[str]] = None) -> List[str]:
+        """
+        Process reels in three overlapping stages connected by queues:
+        scrape (CONCURRENCY workers, each with its own browser context) -> fetch
+        audio (FFMPEG_WORKERS) -> transcribe and save (WHISPER_WORKERS). Each stage
+        works on later reels while the slower ones finish earlier ones.
+        Without a URL list, a scroller task collects URLs from the start reel's feed
+        and hands them to the scrapers as it finds them.
+        Returns 'new', 'skipped' or 'error' per reel for the run summary.
+        """
+        total = len(urls) if urls is not None else self.num_reels
+        url_queue = asyncio.Queue()
+        audio_queue = asyncio.Queue(maxsize=2 * self.concurrency)
+        transcribe_queue = asyncio.Queue(maxsize=2 * self.concurrency)
+        reel_numbers = itertools.count(1)
+        results = []
+        
+        async def feed_urls() -> None:
+            try:
+                if urls is not None:
+                    for url in urls:
+                        await url_queue.put(url)
+                else:
+                    collected = await self.gather_reel_urls(self.num_reels, on_url=url_queue.put)
+                    print(f"Collected {len(collected)} reel URLs")
+                    self.save_url_plan(collected)
+            except Exception as e:
+                # The scrapers still get through whatever was queued before the failure
+                print(f"Error collecting reel URLs: {str(e)}")
+            finally:
+                for _ in range(self.concurrency):
+                    url_queue.put_nowait(None)
+        
+        async def scrape_worker() -> None:
+            # Separate contexts keep the workers' pages and caches independent
+            context = await self.open_context()
+            try:
+                while (url := await url_queue.get()) is not None:
+                    try:
+                        reel = await self.scrape_reel_url(url, next(reel_numbers), total, context)
+                    except Exception as e:
+                        print(f"Error processing reel: {str(e)}")
+                        results.append('error')
+                        continue
+                    if reel is None:
+                        results.append('skipped')
+                    else:
+                        await audio_queue.put(reel)
+            finally:
+                await self.release_context(context)
+        
+        async def audio_worker() -> None:
+            while (reel := await audio_queue.get()) is not None:
+                # A cached transcription makes the audio useless, so don't fetch it
+                if not self.has_transcription(reel):
+                    reel = await self.prepare_audio(reel)
+                await transcribe_queue.put(reel)
+        
+        async def transcribe_worker() -> None:
+            while (reel := await transcribe_queue.get()) is not None:
+                results.append(self.save_reel(await self.transcribe_reel(reel)))
+        
+        feeder = asyncio.create_task(feed_urls())
+        scrapers = [asyncio.create_task(scrape_worker()) for _ in range(self.concurrency)]
+        audio_workers = [asyncio.create_task(audio_worker()) for _ in range(FFMPEG_WORKERS)]
+        transcribers = [asyncio.create_task(transcribe_worker()) for _ in range(WHISPER_WORKERS)]
+        tasks = [feeder, *scrapers, *audio_workers, *transcribers]
+        
+        try:
+            # Shut the stages down in order, one sentinel per worker. A scraper that
+            # dies (e.g. its context won't open) leaves the rest to finish the URLs,
+            # and the reels already scraped still go through to be saved
+            for outcome in await asyncio.gather(feeder, *scrapers, return_exceptions=True):
+                if isinstance(outcome, Exception):
+                    print(f"Scrape worker failed: {str(outcome)}")
+            for _ in audio_workers:
+                await audio_queue.put(None)
+            await asyncio.gather(*audio_workers)
+            for _ in transcribers:
+                await transcribe_queue.put(None)
+            await asyncio.gather(*transcribers)
+        finally:
+            # On any failure or cancellation, don't leave workers blocked on their
+            # queues after the browser is gone
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        return results
+
+    async def close_browser(self) -> None:
+        """Hand this run's context back to the pool; the shared browser stays up for the next run."""
+        if self._api_client:
+            await self._api_client.aclose()
+            self._api_client = None
+        if self._caption_client:
+            await self._caption_client.aclose()
+            self._caption_client = None
+        if self.context:
+            await self.release_context(self.context)
+        if self.browser and self.use_existing_browser:
+            # Only drop our own CDP connection, never the pooled browser
+            await self.browser.close()
+        self.browser = None
+        self.context = None
+        self.page = None
+
+    async def process_reels(self) -> None:
         """Process reels with natural behavior."""
         try:
             if self.is_search:
                 # Create a temporary context for Google search
-                with sync_playwright() as p:
-                    search_browser = p.chromium.launch(
+                async with async_playwright() as p:
+                    search_browser = await p.chromium.launch(
                         headless=False,
-                        slow_mo=int(os.getenv('BROWSER_SLOWMO', '0'))
+                        slow_mo=self.slowmo
                     )
-                    search_context = search_browser.new_context(
+                    search_context = await search_browser.new_context(
                         user_agent=self.get_random_user_agent()
                     )
-                    search_page = search_context.new_page()
+                    search_page = await search_context.new_page()
                     
                     try:
                         # Get URLs from Google search
-                        reel_urls = self.get_reel_urls_from_google(
+                        reel_urls = await self.get_reel_urls_from_google(
                             self.start_input,
                             self.num_reels,
                             search_page=search_page
                         )
                     finally:
-                        search_context.close()
-                        search_browser.close()
+                        await search_context.close()
+                        await search_browser.close()
                 
                 if not reel_urls:
                     raise ValueError(f"No reels found for keyword: {self.start_input}")
@@ -789,7 +1492,7 @@ class InstagramReelExtractor:
                     # Switch to file mode processing
                     self.start_input = str(temp_file)
                     self.is_search = False  # Switch to URL mode
-                    self.process_reels()  # Recursively call with file mode
+                    await self.process_reels()  # Recursively call with file mode
                     
                     # Clean up temp file
                     temp_file.unlink()
@@ -797,104 +1500,64 @@ class InstagramReelExtractor:
                     raise ValueError("Failed to create temporary URL file")
             
             else:
-                self.setup_browser()
-                self.login_to_instagram()
-                time.sleep(2)
-                
-                print(f"\n{datetime.now().strftime('%Y-%m-%d %H:%M:%S')} - Starting to process {self.num_reels} reels")
+                # One directory scan up front instead of a stat() per reel
+                self._seen = {p.stem for p in self.output_dir.glob('*.json')}
                 
                 if self.start_input.endswith('.txt'):
                     # File mode - process URLs from file
                     with open(self.start_input, 'r') as f:
-                        urls = [self.normalize_reel_url(line.strip()) for line in f if line.strip()]
-                    total_urls = len(urls)
-                    print(f"Found {total_urls} URLs in file")
-                    
-                    processed_count = 0
-                    skipped_count = 0
-                    
-                    # Process each URL individually
-                    for idx, url in enumerate(urls[:self.num_reels], 1):
-                        print(f"\n{datetime.now().strftime('%Y-%m-%d %H:%M:%S')} - Processing reel {idx}/{min(total_urls, self.num_reels)}")
-                        
-                        try:
-                            # Process each URL using the extract_reel_data method
-                            reel_data = self.extract_reel_data(url)
-                            reel_id = reel_data['reel_id']  # Use the reel_id from the processed data
-                            output_file = self.output_dir / f"{reel_id}.json"
-                            
-                            if output_file.exists():
-                                print(f"Reel {reel_id} already exists in {output_file}, skipping.")
-                                skipped_count += 1
-                                processed_count += 1
-                                continue
-                            
-                            with open(output_file, 'w') as f:
-                                json.dump(reel_data, f, indent=4)
-                            print(f"Saved new reel data to {output_file}")
-                            processed_count += 1
-                            
-                            # Add delay between reels
-                            if processed_count < min(total_urls, self.num_reels):
-                                delay = random.uniform(2, 3)
-                                print(f"Waiting {delay:.1f} seconds before next reel...")
-                                time.sleep(delay)
-                            
-                        except Exception as e:
-                            print(f"Error processing reel: {str(e)}")
-                            continue
-                        
-                        if processed_count >= self.num_reels:
-                            break
+                        lines = [line.strip() for line in f if line.strip()]
+                    # The same reel listed twice would otherwise be scraped and transcribed twice
+                    urls = list({reel_shortcode(url): self.normalize_reel_url(url) for url in lines}.values())
+                    print(f"Found {len(lines)} URLs in file ({len(urls)} unique)")
+                    urls = urls[:self.num_reels]
+                    done = sum(reel_shortcode(url) in self._seen for url in urls)
+                    if done:
+                        print(f"{done} of them already exist in {self.output_dir}")
                 
                 else:
-                    # Single URL mode
+                    # Single URL mode: replay the URLs collected last time from this reel,
+                    # or let the pipeline scroll through the feed, processing reels while
+                    # it is still collecting URLs
                     self.start_input = self.normalize_reel_url(self.start_input)
-                    processed_count = 0
-                    skipped_count = 0
-                    current_url = self.start_input
-                    
-                    while processed_count < self.num_reels:
-                        print(f"\n{datetime.now().strftime('%Y-%m-%d %H:%M:%S')} - Processing reel {processed_count + 1}/{self.num_reels}")
-                        
-                        reel_id = current_url.strip('/').split('/')[-1]
-                        output_file = self.output_dir / f"{reel_id}.json"
-                        
-                        if output_file.exists():
-                            print(f"Reel {reel_id} already exists in {output_file}, skipping.")
-                            skipped_count += 1
-                            processed_count += 1
-                        else:
-                            try:
-                                reel_data = self.extract_reel_data(current_url)
-                                with open(output_file, 'w') as f:
-                                    json.dump(reel_data, f, indent=4)
-                                print(f"Saved new reel data to {output_file}")
-                                processed_count += 1
-                            except Exception as e:
-                                print(f"Error processing reel {reel_id}: {str(e)}")
-                                break
-                        
-                        if processed_count >= self.num_reels:
-                            break
-                        
-                        try:
-                            current_url = self.scroll_to_next_reel()
-                        except Exception as e:
-                            print(f"Error scrolling to next reel: {str(e)}")
-                            break
+                    urls = self.load_url_plan()
+                    if urls is not None:
+                        print(f"Using {len(urls)} reel URLs cached from a previous run")
                 
-                print(f"\n{datetime.now().strftime('%Y-%m-%d %H:%M:%S')} - Completed processing {processed_count} reels")
+                if urls is not None and all(reel_shortcode(url) in self._seen for url in urls):
+                    # Nothing left to do, so don't start the browser at all
+                    print(f"All {len(urls)} reels already exist in {self.output_dir}")
+                    return
+                
+                await self.setup_browser()
+                await self.login_to_instagram()
+                await self.open_api_client()
+                
+                log.info(f"Starting to process {self.num_reels} reels")
+                
+                # The reels are independent, so scraping, audio extraction and
+                # transcription of different reels all overlap
+                results = await self.run_pipeline(urls)
+                skipped_count = results.count('skipped')
+                processed_count = results.count('new') + skipped_count
+                
+                log.info(f"Completed processing {processed_count} reels")
                 print(f"New reels: {processed_count - skipped_count}")
                 print(f"Skipped reels: {skipped_count}")
         
         except Exception as e:
-            print(f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')} - Error processing reel: {str(e)}")
+            log.error(f"Error processing reel: {str(e)}")
         
         finally:
-            if self.browser:
-                time.sleep(0.5)
-                self.browser.close()
+            await self.close_browser()
+
+async def run(extractor: InstagramReelExtractor, close_browser: bool = False) -> None:
+    """Run the extractor, then disconnect from the shared browser before the event loop ends.
+    The browser itself keeps running for the next run unless close_browser is set."""
+    try:
+        await extractor.process_reels()
+    finally:
+        await browser_pool.close(shutdown_browser=close_browser)
 
 def main():
     import argparse
@@ -919,9 +1582,15 @@ def main():
                       help='Comma-separated terms to exclude from search')
     parser.add_argument('--safe-search', choices=['off', 'moderate', 'strict'],
                       default='off', help='Safe search level')
+    parser.add_argument('--concurrency', type=int,
+                      help='Number of reels scraped at the same time, each in its own browser context (default: CONCURRENCY or min(4, num-reels))')
+    parser.add_argument('--close-browser', action='store_true',
+                      help='Shut down the shared background browser when done instead of keeping it for the next run')
     
     args = parser.parse_args()
     
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(message)s', datefmt='%Y-%m-%d %H:%M:%S')
+    
     # Set environment variables from command line arguments
     if args.time_range:
         os.environ['SEARCH_TIME_RANGE'] = args.time_range
@@ -933,6 +1602,8 @@ def main():
         os.environ['SEARCH_EXCLUDE'] = args.exclude
     if args.safe_search:
         os.environ['SEARCH_SAFE'] = args.safe_search
+    if args.concurrency:
+        os.environ['CONCURRENCY'] = str(args.concurrency)
     
     start_input = args.search if args.search else args.url
     is_search = bool(args.search)
@@ -943,7 +1614,7 @@ def main():
         Path(os.getenv('OUTPUT_DIR', 'output')),
         is_search=is_search
     )
-    extractor.process_reels()
+    asyncio.run(run(extractor, close_browser=args.close_browser))
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -1,3 +1,10 @@
+import re
+
+try:
+    import ahocorasick
+except ImportError:  # pyahocorasick is optional; fall back to a compiled regex
+    ahocorasick = None
+
 def get_default_keywords():
     """Get the default list of Japan-related keywords."""
     return [
@@ -9,4 +16,37 @@ def get_default_keywords():
         'suica', 'teamlab', 'ghibli', 'disney',
         'miso', 'tempura', 'okonomiyaki', 'yakitori', 'takoyaki',
         'katsu'
-    ] 
\ No newline at end of file
+    ]
+
+class RegexKeywordAutomaton:
+    """
+    Stand-in for ahocorasick.Automaton when pyahocorasick is not installed.
+    Matches all keywords with one precompiled alternation and mirrors Automaton.iter().
+    """
+
+    def __init__(self, keywords):
+        # Longest first so overlapping keywords report the longer match
+        keywords = sorted(keywords, key=lambda k: (-len(k), k))
+        self._pattern = re.compile('|'.join(map(re.escape, keywords)) if keywords else r'(?!)')
+
+    def iter(self, text: str):
+        """Yield (end_index, keyword) for each match, like Automaton.iter()."""
+        for match in self._pattern.finditer(text):
+            yield match.end() - 1, match.group()
+
+def build_keyword_automaton(keywords: list):
+    """
+    Build a matcher over the lowercased keywords.
+    Build it once and reuse it: a single pass over lowercased text finds any keyword.
+    Uses Aho-Corasick when pyahocorasick is installed, otherwise a compiled regex.
+    """
+    # Lowercased and deduplicated, e.g. 'Japan' and 'japan' become one pattern
+    keywords = frozenset(k.lower() for k in keywords if k)
+    if ahocorasick is None:
+        return RegexKeywordAutomaton(keywords)
+
+    automaton = ahocorasick.Automaton()
+    for keyword in keywords:
+        automaton.add_word(keyword, keyword)
+    automaton.make_automaton()
+    return automaton
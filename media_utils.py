@@ -1,9 +1,16 @@
 import os
+import json
 from pathlib import Path
 import subprocess
 import tempfile
-from typing import Tuple
-from pydub import AudioSegment
+from typing import List, Optional, Tuple
+
+# Streamable container, upload filename and MIME type for each codec piped to Whisper
+PIPE_AUDIO_FORMATS = {
+    "aac": ("mp4", "audio.m4a", "audio/mp4"),
+    "mp3": ("mp3", "audio.mp3", "audio/mpeg"),
+    "opus": ("ogg", "audio.ogg", "audio/ogg"),
+}
 
 def download_video(video_url: str, output_dir: Path) -> Tuple[Path, str]:
     """
@@ -13,11 +20,14 @@ def download_video(video_url: str, output_dir: Path) -> Tuple[Path, str]:
     # Create a temporary directory for downloads
     temp_dir = Path(tempfile.mkdtemp())
     
-    # Use yt-dlp to download the video
+    # Use yt-dlp to download the video, fetching DASH fragments over parallel
+    # connections and large files in 10 MB ranged chunks
     video_path = temp_dir / "video.mp4"
     command = [
         "yt-dlp",
         "-f", "best",
+        "--concurrent-fragments", "8",
+        "--http-chunk-size", "10M",
         "-o", str(video_path),
         video_url
     ]
@@ -29,33 +39,104 @@ def download_video(video_url: str, output_dir: Path) -> Tuple[Path, str]:
         print(f"Error downloading video: {e.stderr.decode()}")
         raise
 
-def extract_audio(video_path: Path, output_dir: Path) -> Path:
+def _whisper_opus_args() -> List[str]:
+    """
+    ffmpeg arguments extract_audio_bytes uses to re-encode audio it can't copy:
+    Opus at Whisper's own input format. Whisper resamples everything to 16 kHz
+    mono, so anything more is wasted upload.
     """
-    Extract audio from the video file and return the path to the audio file.
+    return [
+        "-ac", "1",
+        "-ar", "16000",
+        "-c:a", "libopus",
+        "-b:a", os.getenv("WHISPER_AUDIO_BITRATE", "16k")
+    ]
+
+def probe_audio(media_path: Path) -> Tuple[Optional[str], float]:
     """
-    audio_path = output_dir / f"{video_path.stem}.mp3"
+    Return the first audio stream's codec name (None if there isn't one) and the
+    file's duration in seconds, with a single ffprobe run.
+    """
+    command = [
+        "ffprobe",
+        "-v", "error",
+        "-select_streams", "a:0",
+        "-show_entries", "stream=codec_name:format=duration",
+        "-of", "json",
+        str(media_path)
+    ]
+    
+    try:
+        result = subprocess.run(command, check=True, capture_output=True, text=True)
+        info = json.loads(result.stdout)
+        streams = info.get("streams") or [{}]
+        duration = float((info.get("format") or {}).get("duration") or 0.0)
+        return streams[0].get("codec_name"), duration
+    except (subprocess.CalledProcessError, ValueError) as e:
+        print(f"Error probing media: {str(e)}")
+        return None, 0.0
+
+def extract_audio_bytes(video_path: Path, codec: Optional[str]) -> Tuple[str, bytes, str]:
+    """
+    Extract the audio track into memory without writing it to disk, copying it
+    when its codec (as reported by probe_audio) can be piped as-is.
+    Returns (filename, data, mime_type), which can be passed straight to the
+    Whisper API as its file argument.
+    """
+    if codec in PIPE_AUDIO_FORMATS:
+        container, filename, mime_type = PIPE_AUDIO_FORMATS[codec]
+        codec_args = ["-c:a", "copy"]
+    else:
+        container, filename, mime_type = PIPE_AUDIO_FORMATS["opus"]
+        codec_args = _whisper_opus_args()
     
-    # First extract audio using ffmpeg
     command = [
         "ffmpeg",
         "-i", str(video_path),
-        "-q:a", "0",
+        "-vn",
         "-map", "a",
-        str(audio_path)
+        *codec_args,
+        "-f", container
     ]
+    if container == "mp4":
+        # A plain MP4 seeks back to write its index; a fragmented one can go to a pipe
+        command += ["-movflags", "frag_keyframe+empty_moov"]
+    command.append("pipe:1")
     
     try:
-        subprocess.run(command, check=True, capture_output=True)
-        
-        # Reduce bitrate for OpenAI API compatibility
-        audio = AudioSegment.from_file(str(audio_path))
-        reduced_audio_path = output_dir / f"{video_path.stem}_reduced.mp3"
-        audio.export(str(reduced_audio_path), bitrate='128k', format='mp3')
-        
-        # Remove original audio file
-        audio_path.unlink()
-        
-        return reduced_audio_path
+        result = subprocess.run(command, check=True, capture_output=True)
+        return filename, result.stdout, mime_type
+    except subprocess.CalledProcessError as e:
+        print(f"Error extracting audio: {e.stderr.decode()}")
+        raise
+
+def fetch_and_extract(video_url: str) -> Tuple[str, bytes, str]:
+    """
+    Have ffmpeg read a video straight from its CDN URL and return its audio
+    as (filename, data, mime_type), without writing the video or audio to disk.
+    ffmpeg fetches the URL itself with range requests, so this also works for
+    MP4s that keep their index at the end.
+    """
+    container, filename, mime_type = PIPE_AUDIO_FORMATS["aac"]
+    command = [
+        "ffmpeg",
+        "-loglevel", "error",
+        "-i", video_url,
+        "-vn",
+        "-map", "a",
+        "-c:a", "copy",
+        "-f", container,
+        "-movflags", "frag_keyframe+empty_moov",
+        "pipe:1"
+    ]
+    
+    try:
+        # A large pipe buffer keeps the read loop from waking for every small write
+        proc = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, bufsize=1 << 20)
+        data, stderr = proc.communicate()
+        if proc.returncode != 0:
+            raise subprocess.CalledProcessError(proc.returncode, command, data, stderr)
+        return filename, data, mime_type
     except subprocess.CalledProcessError as e:
         print(f"Error extracting audio: {e.stderr.decode()}")
         raise
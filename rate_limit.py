@@ -0,0 +1,57 @@
+import time
+import threading
+
+class TokenBucket:
+    """
+    Thread-safe limiter for requests per minute and (estimated) tokens per minute.
+    Callers block in acquire() until both budgets allow the request; a limit of 0
+    disables that budget.
+    """
+
+    def __init__(self, rpm: float, tpm: float = 0):
+        self.rpm = rpm
+        self.tpm = tpm
+        self._requests = float(rpm)
+        self._tokens = float(tpm)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        """Top both budgets up for the time since the last refill."""
+        elapsed = now - self._updated
+        self._updated = now
+        if self.rpm:
+            self._requests = min(self.rpm, self._requests + elapsed * self.rpm / 60)
+        if self.tpm:
+            self._tokens = min(self.tpm, self._tokens + elapsed * self.tpm / 60)
+
+    def acquire(self, est_tokens: float = 0) -> None:
+        """Block until one request using est_tokens tokens fits within the limits."""
+        # A request bigger than the whole minute budget would otherwise wait forever
+        est_tokens = min(est_tokens, self.tpm) if self.tpm else 0
+
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                wait = self._blocked_until - now
+                if wait <= 0:
+                    missing_requests = 1 - self._requests if self.rpm else 0
+                    missing_tokens = est_tokens - self._tokens if self.tpm else 0
+                    if missing_requests <= 0 and missing_tokens <= 0:
+                        if self.rpm:
+                            self._requests -= 1
+                        if self.tpm:
+                            self._tokens -= est_tokens
+                        return
+                    wait = max(
+                        missing_requests * 60 / self.rpm if self.rpm else 0,
+                        missing_tokens * 60 / self.tpm if self.tpm else 0
+                    )
+            time.sleep(wait)
+
+    def pause(self, seconds: float) -> None:
+        """Hold back every caller for the given time, e.g. after a 429 with Retry-After."""
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
@@ -46,16 +46,19 @@ def get_reel_data(reel_url: str) -> Dict:
     try:
         print(f"\nFetching data for shortcode: {shortcode}")
         
-        # Use the public API endpoint
-        api_url = f"https://www.instagram.com/api/v1/web/get_ruling_for_content/?content_type=MEDIA&surface=POST&content_id={shortcode}"
+        response = None
         
-        print("Sending request...")
-        response = client.get(api_url)
-        
-        print(f"Status Code: {response.status_code}")
+        # The ruling endpoint rarely answers 200, so it costs a round trip for nothing
+        # unless asked for explicitly
+        if os.getenv('IG_RULING_PROBE') == '1':
+            api_url = f"https://www.instagram.com/api/v1/web/get_ruling_for_content/?content_type=MEDIA&surface=POST&content_id={shortcode}"
+            
+            print("Sending request...")
+            response = client.get(api_url)
+            
+            print(f"Status Code: {response.status_code}")
         
-        # Try alternative endpoint if first one fails
-        if response.status_code != 200:
+        if response is None or response.status_code != 200:
             print("Trying alternative endpoint...")
             alt_url = f"https://www.instagram.com/p/{shortcode}/?__a=1&__d=dis"
             response = client.get(alt_url)
@@ -0,0 +1,92 @@
+import os
+import asyncio
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+# The extractor refuses to import without an API key; no request is ever made here
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+try:
+    import instagram_reel_extractor as extractor_module
+except ImportError:
+    extractor_module = None
+
+REEL_URL = "https://www.instagram.com/reels/ABC123/"
+
+@unittest.skipIf(extractor_module is None, "extractor dependencies not installed")
+class CachedReelPipelineTest(unittest.TestCase):
+    """Reels with a cached transcription must not have their audio fetched again."""
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.output_dir = Path(self._tmp.name)
+        credentials = {"INSTAGRAM_USERNAME": "user", "INSTAGRAM_PASSWORD": "password"}
+        with mock.patch.dict(os.environ, credentials):
+            self.extractor = extractor_module.InstagramReelExtractor(REEL_URL, 1, self.output_dir)
+        # No browser: contexts are only handed to scrape_reel_url
+        self.extractor.open_context = mock.AsyncMock(return_value=mock.MagicMock())
+        self.extractor.release_context = mock.AsyncMock()
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def run_pipeline(self):
+        with mock.patch.object(extractor_module, "download_video") as download_video, \
+                mock.patch.object(extractor_module, "fetch_and_extract") as fetch_and_extract:
+            results = asyncio.run(self.extractor.run_pipeline([REEL_URL]))
+        download_video.assert_not_called()
+        fetch_and_extract.assert_not_called()
+        return results
+
+    def test_fully_cached_reel_skips_audio(self):
+        self.extractor.write_cache("captions", "ABC123", "a caption")
+        self.extractor.write_cache("transcriptions", "ABC123", "cached text")
+        self.extractor.fetch_reel_metadata = mock.AsyncMock()
+
+        self.assertEqual(self.run_pipeline(), ["new"])
+        self.extractor.fetch_reel_metadata.assert_not_called()
+        self.assertTrue((self.output_dir / "ABC123.json").exists())
+
+    def test_cached_transcription_skips_audio(self):
+        # No cached caption, so the reel is scraped, but its audio isn't needed
+        self.extractor.write_cache("transcriptions", "ABC123", "cached text")
+        self.extractor.fetch_reel_metadata = mock.AsyncMock(return_value={
+            "reel_id": "ABC123",
+            "url": REEL_URL,
+            "caption": "",
+            "video_url": None,
+            "duration": 0.0,
+        })
+
+        self.assertEqual(self.run_pipeline(), ["new"])
+
+@unittest.skipIf(extractor_module is None, "extractor dependencies not installed")
+class PipelineShutdownTest(unittest.TestCase):
+    """A failing stage must not leave the other workers waiting forever."""
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        credentials = {"INSTAGRAM_USERNAME": "user", "INSTAGRAM_PASSWORD": "password"}
+        with mock.patch.dict(os.environ, credentials):
+            self.extractor = extractor_module.InstagramReelExtractor(REEL_URL, 1, Path(self._tmp.name))
+        self.extractor.open_context = mock.AsyncMock(return_value=mock.MagicMock())
+        self.extractor.release_context = mock.AsyncMock()
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def run_pipeline(self, urls=None):
+        return asyncio.run(asyncio.wait_for(self.extractor.run_pipeline(urls), timeout=5))
+
+    def test_feeder_failure_shuts_down(self):
+        self.extractor.gather_reel_urls = mock.AsyncMock(side_effect=TimeoutError("start reel"))
+        self.assertEqual(self.run_pipeline(), [])
+
+    def test_scraper_failure_shuts_down(self):
+        self.extractor.open_context = mock.AsyncMock(side_effect=RuntimeError("no browser"))
+        self.assertEqual(self.run_pipeline([REEL_URL]), [])
+
+if __name__ == "__main__":
+    unittest.main()
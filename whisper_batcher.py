@@ -0,0 +1,124 @@
+import os
+import time
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Optional
+
+SAMPLING_RATE = 16000
+
+class WhisperBatcher:
+    """
+    Collects transcription requests from many threads and runs them through a local
+    transformers Whisper pipeline on the GPU in batches, so N reels cost one
+    forward pass instead of N HTTP round-trips. When silero-vad is installed,
+    silence and music-only stretches are cut out before the audio is queued.
+    """
+
+    def __init__(self, model_name: str, batch_size: int = 8, max_wait: float = 0.5):
+        import torch
+        from transformers import pipeline
+
+        self.pipe = pipeline(
+            "automatic-speech-recognition",
+            model_name,
+            torch_dtype=torch.float16,
+            device="cuda:0"
+        )
+        self.batch_size = batch_size
+        self.max_wait = max_wait
+        self._requests = queue.Queue()
+        
+        try:
+            import silero_vad
+            self._vad = silero_vad
+        except ImportError:
+            self._vad = None
+        # The VAD model keeps state between calls, so each calling thread gets its own
+        self._vad_models = threading.local()
+        threading.Thread(target=self._run, name="whisper-batcher", daemon=True).start()
+
+    def transcribe(self, data: bytes) -> str:
+        """Queue encoded audio for the next batch and block until its text is ready."""
+        audio = data
+        if self._vad is not None:
+            audio = self._voiced_audio(data)
+            if audio is None:
+                return ""
+        future = Future()
+        self._requests.put((audio, future))
+        return future.result()
+
+    def _voiced_audio(self, data: bytes) -> Optional[dict]:
+        """Decode the audio and keep only the stretches with speech, or None if there are none.
+        Runs in the calling thread, so reels are trimmed in parallel while the GPU works."""
+        import numpy as np
+        import torch
+        from transformers.pipelines.audio_utils import ffmpeg_read
+
+        model = getattr(self._vad_models, "model", None)
+        if model is None:
+            model = self._vad_models.model = self._vad.load_silero_vad()
+
+        wav = ffmpeg_read(data, SAMPLING_RATE)
+        timestamps = self._vad.get_speech_timestamps(
+            torch.from_numpy(wav), model,
+            sampling_rate=SAMPLING_RATE,
+            min_silence_duration_ms=500
+        )
+        if not timestamps:
+            return None
+        voiced = np.concatenate([wav[ts["start"]:ts["end"]] for ts in timestamps])
+        return {"raw": voiced, "sampling_rate": SAMPLING_RATE}
+
+    def _run(self) -> None:
+        """Form batches of up to batch_size requests, waiting at most max_wait for stragglers."""
+        while True:
+            batch = [self._requests.get()]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self._requests.get(timeout=timeout))
+                except queue.Empty:
+                    break
+
+            try:
+                outputs = self.pipe(
+                    [audio for audio, _ in batch],
+                    chunk_length_s=30,
+                    batch_size=len(batch),
+                    return_timestamps=False,
+                    generate_kwargs={"language": "en"}
+                )
+                # Outputs come back in input order, one per reel
+                for (_, future), output in zip(batch, outputs):
+                    future.set_result(output["text"].strip())
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+
+_batcher = None
+_batcher_checked = False
+_batcher_lock = threading.Lock()
+
+def get_batcher() -> Optional[WhisperBatcher]:
+    """Return the shared batcher, or None when transformers or a CUDA GPU isn't available."""
+    global _batcher, _batcher_checked
+    with _batcher_lock:
+        if not _batcher_checked:
+            _batcher_checked = True
+            try:
+                import torch
+                if torch.cuda.is_available():
+                    _batcher = WhisperBatcher(
+                        os.getenv("WHISPER_HF_MODEL", "openai/whisper-large-v3"),
+                        batch_size=int(os.getenv("WHISPER_BATCH_SIZE", "8"))
+                    )
+                else:
+                    print("No CUDA GPU found, using the OpenAI Whisper API instead")
+            except ImportError:
+                print("transformers/torch not installed, using the OpenAI Whisper API instead")
+    return _batcher